@@ -1,12 +1,360 @@
+import os
+import io
+import re
+import hashlib
+import urllib.parse
+import urllib.request
 import pandas as pd
+import numpy as onp
 import cachetools.func
 import warnings
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 from . import states
 
+
+'''JHU data sources'''
+
+# Base URL can be changed (e.g., to a local server for testing) with
+# MECHBAYES_JHU_URL or by assigning to jhu.baseURL
+baseURL = os.environ.get('MECHBAYES_JHU_URL',
+                         "https://raw.githubusercontent.com/CSSEGISandData/COVID-19/master/csse_covid_19_data/")
+
+SOURCES = {
+    'confirmed_global' : ('csse_covid_19_time_series/time_series_covid19_confirmed_global.csv', {}),
+    'deaths_global'    : ('csse_covid_19_time_series/time_series_covid19_deaths_global.csv', {}),
+    'confirmed_US'     : ('csse_covid_19_time_series/time_series_covid19_confirmed_US.csv', {}),
+    'deaths_US'        : ('csse_covid_19_time_series/time_series_covid19_deaths_US.csv', {}),
+    'lookup'           : ('UID_ISO_FIPS_LookUp_Table.csv', {'dtype': {'FIPS': object}})
+}
+
+# Maximum number of sources downloaded at once
+MAX_FETCH_THREADS = 4
+
+
+def source_url(name):
+    return baseURL + SOURCES[name][0]
+
+
+'''Local snapshot store
+
+If a snapshot directory is set (see use_snapshots), each source is fetched
+once and written to <snapshot_dir>/<snapshot>/<source>.npz, where the
+snapshot name defaults to today's date. Later loaders (in this or any other
+process) read the local copy. In offline mode, sources are never fetched
+from the network.
+
+The directory and snapshot can also be set with the environment variables
+MECHBAYES_DATA_DIR, MECHBAYES_DATA_SNAPSHOT and MECHBAYES_OFFLINE.
+'''
+
+snapshot_dir = os.environ.get('MECHBAYES_DATA_DIR')
+snapshot = os.environ.get('MECHBAYES_DATA_SNAPSHOT')
+offline = bool(os.environ.get('MECHBAYES_OFFLINE'))
+
+
+def use_snapshots(directory, name=None, offline_mode=False):
+    '''Read sources from (and save them to) a local snapshot store'''
+    global snapshot_dir, snapshot, offline
+    snapshot_dir = directory
+    snapshot = name
+    offline = offline_mode
+    clear_caches()
+
+
+def clear_caches():
+    with source_lock:
+        source_cache.clear()
+    for f in [load_and_massage, load_countries, load_us, get_county_info, get_state_info]:
+        f.cache_clear()
+
+
+def snapshot_name():
+    '''Name of snapshot in use: the one set explicitly, or else today's date
+
+    In offline mode with no snapshot set, use the latest one available.
+    '''
+    if snapshot:
+        return snapshot
+    if offline:
+        available = sorted((p.name for p in Path(snapshot_dir).iterdir() if p.is_dir()), key=snapshot_key)
+        if not available:
+            raise FileNotFoundError(f"No data snapshots in {snapshot_dir}")
+        return available[-1]
+    return pd.Timestamp.now().strftime('%Y-%m-%d')
+
+
+def snapshot_key(name):
+    '''Sort key for snapshot names: by date if the name is a date, else before all dates'''
+    date = pd.to_datetime(name, errors='coerce')
+    return (pd.Timestamp.min if pd.isnull(date) else date, name)
+
+
+def save_frame(df, filename):
+    '''Save data frame column-by-column in npz file (no pickling)'''
+    arrays = {'columns': onp.array([str(c) for c in df.columns])}
+    for i, c in enumerate(df.columns):
+        values = df[c].values
+        if values.dtype == object:
+            null = pd.isnull(values)
+            arrays[f'null_{i}'] = null
+            values = onp.where(null, '', values).astype(str)
+        arrays[f'col_{i}'] = values
+
+    # write to temporary file and move into place so readers never see partial files
+    tmp = Path(filename).with_name(f'.{Path(filename).name}.{os.getpid()}.npz')
+    onp.savez(tmp, **arrays)
+    os.replace(tmp, filename)
+
+
+def load_frame(filename):
+    '''Load data frame saved by save_frame'''
+    with onp.load(filename) as x:
+        columns = {}
+        for i, c in enumerate(x['columns']):
+            values = x[f'col_{i}']
+            if f'null_{i}' in x:
+                values = values.astype(object)
+                values[x[f'null_{i}']] = onp.nan
+            columns[c] = values
+    return pd.DataFrame(columns)
+
+
+def download_source(name):
+    '''Get raw data frame for one source, from the snapshot store if in use'''
+
+    url, read_args = source_url(name), SOURCES[name][1]
+
+    if snapshot_dir is None:
+        return pd.read_csv(url, **read_args)
+
+    current = snapshot_name()
+    filename = Path(snapshot_dir) / current / f'{name}.npz'
+    if filename.exists():
+        return load_frame(filename)
+
+    if offline:
+        raise FileNotFoundError(f"Data snapshot {filename} not found (offline mode)")
+
+    raw = read_bytes(url)
+    previous = previous_snapshot(name, current)
+    if previous is None:
+        df = pd.read_csv(io.BytesIO(raw), **read_args)
+    else:
+        df = ingest(name, raw, load_frame(previous), load_row_hashes(previous), filename.parent)
+
+    filename.parent.mkdir(parents=True, exist_ok=True)
+    save_frame(df, filename)
+    save_row_hashes(raw, df, row_hash_path(filename))
+    return df
+
+
+'''Incremental ingestion
+
+The time series files gain one date column per day. When a new snapshot
+is created and an earlier one exists, only the date columns that are new
+since the earlier snapshot, plus the last REVISION_WINDOW days, are
+parsed and appended to the stored frame. Values that differ from the
+earlier snapshot are retroactive revisions: they are applied, reported,
+and written to <snapshot>/<source>_revisions.csv.
+
+Older columns are not parsed. Instead, each snapshot stores a hash of the
+raw text of each row up to the start of its window (<source>_rows.npz),
+and the same text of the new file is hashed and compared. If any row
+differs, or the metadata or set of rows changed, the whole file is parsed.
+'''
+
+# Number of trailing days that are re-read to detect revisions
+REVISION_WINDOW = 28
+
+DATE_COLUMN = re.compile(r'^\d{1,2}/\d{1,2}/\d{2,4}$')
+
+# Columns that identify a row in revision reports
+ROW_KEYS = ['UID', 'Combined_Key', 'Country/Region', 'Province/State']
+
+
+def is_date_column(column):
+    return bool(DATE_COLUMN.match(str(column)))
+
+
+def previous_snapshot(name, current):
+    '''Latest file for source in a snapshot before current (or None)'''
+    files = [p for p in Path(snapshot_dir).glob(f'*/{name}.npz') if snapshot_key(p.parent.name) < snapshot_key(current)]
+    return max(files, key=lambda p: snapshot_key(p.parent.name)) if files else None
+
+
+def row_hash_path(filename):
+    return Path(filename).with_name(f'{Path(filename).stem}_rows.npz')
+
+
+def row_hashes(raw, num_dates, num_hashed):
+    '''Hash the raw text of each data row up to (not including) date column num_hashed
+
+    Date fields are numbers, so the text is found by splitting from the
+    right; metadata fields may contain quoted commas.
+    '''
+    lines = [line for line in raw.decode('utf-8').splitlines()[1:] if line]
+    tail = num_dates - num_hashed
+    return onp.array([hashlib.blake2b((line.rsplit(',', tail)[0] if tail else line).encode(), digest_size=16).digest()
+                      for line in lines])
+
+
+def save_row_hashes(raw, df, filename, window=REVISION_WINDOW):
+    '''Save row hashes of a new snapshot for comparison by the next one'''
+    num_dates = sum(is_date_column(c) for c in df.columns)
+    if num_dates == 0:
+        return
+    num_hashed = max(num_dates - window, 0)
+    tmp = filename.with_name(f'.{filename.name}.{os.getpid()}.npz')
+    onp.savez(tmp, hashes=row_hashes(raw, num_dates, num_hashed), num_hashed=num_hashed)
+    os.replace(tmp, filename)
+
+
+def load_row_hashes(filename):
+    '''Row hashes of a snapshot as (hashes, number of hashed date columns), or None'''
+    try:
+        with onp.load(row_hash_path(filename)) as x:
+            return x['hashes'], int(x['num_hashed'])
+    except FileNotFoundError:
+        return None
+
+
+def report_revisions(name, prev, df, columns, directory):
+    '''Report values in columns that differ between prev and df. Returns the number of revisions'''
+    old_values = prev[columns].values
+    new_values = df[columns].values
+    rows, cols = onp.nonzero((old_values != new_values) & ~(pd.isnull(old_values) & pd.isnull(new_values)))
+    if len(rows) > 0:
+        meta = [c for c in ROW_KEYS if c in prev.columns]
+        revisions = prev.iloc[rows][meta].reset_index(drop=True)
+        revisions['date'] = [columns[j] for j in cols]
+        revisions['old'] = old_values[rows, cols]
+        revisions['new'] = new_values[rows, cols]
+        directory.mkdir(parents=True, exist_ok=True)
+        revisions.to_csv(directory / f'{name}_revisions.csv', index=False)
+        warnings.warn(f"{name}: {len(revisions)} values revised "
+                      f"(see {directory / f'{name}_revisions.csv'})")
+    return len(rows)
+
+
+def read_bytes(url):
+    if urllib.parse.urlparse(url).scheme in ('http', 'https', 'ftp', 'file'):
+        with urllib.request.urlopen(url) as response:
+            return response.read()
+    with open(url, 'rb') as f:
+        return f.read()
+
+
+def ingest(name, raw, prev, prev_rows, directory):
+    '''Parse only what changed in the raw source file since the frame prev
+
+    prev_rows are the row hashes saved with prev (see load_row_hashes).
+    '''
+
+    read_args = SOURCES[name][1]
+
+    header = list(pd.read_csv(io.BytesIO(raw), nrows=0).columns)
+    meta = [c for c in header if not is_date_column(c)]
+    dates = [c for c in header if is_date_column(c)]
+    prev_dates = [c for c in prev.columns if is_date_column(c)]
+
+    def full_parse(reason):
+        print(f"{name}: parsing all columns ({reason})")
+        return pd.read_csv(io.BytesIO(raw), **read_args)
+
+    if not dates:
+        return full_parse("no date columns")
+    if prev_rows is None:
+        return full_parse("no row hashes for previous snapshot")
+    if meta != [c for c in prev.columns if not is_date_column(c)] or dates[:len(prev_dates)] != prev_dates:
+        return full_parse("columns changed")
+
+    # Compare rows up to the window of the previous snapshot without parsing them
+    prev_hashes, num_hashed = prev_rows
+    hashes = row_hashes(raw, len(dates), num_hashed)
+    if len(hashes) != len(prev) or len(prev_hashes) != len(prev):
+        return full_parse("rows changed")
+    if not onp.array_equal(hashes, prev_hashes):
+        df = full_parse("older values revised")
+        if len(df) != len(prev) or not df[meta].equals(prev[meta]):
+            return df
+        num_revised = report_revisions(name, prev, df, prev_dates, directory)
+        print(f"{name}: {len(dates) - len(prev_dates)} new dates, {num_revised} revised values")
+        return df
+
+    recent = prev_dates[num_hashed:]
+    new = dates[len(prev_dates):]
+    df = pd.read_csv(io.BytesIO(raw), usecols=meta + recent + new, **read_args)
+
+    if len(df) != len(prev) or not df[meta].equals(prev[meta]):
+        return full_parse("rows changed")
+
+    # Apply and report revisions to recent dates
+    num_revised = report_revisions(name, prev, df, recent, directory)
+
+    print(f"{name}: {len(new)} new dates, {num_revised} revised values")
+
+    df = pd.concat([prev[meta + prev_dates[:num_hashed]], df[recent + new]], axis=1)
+    return df
+
+
+'''Fetch layer
+
+Each source is downloaded and parsed at most once per process (within the
+cache lifetime), and the parsed frame is shared by all loaders that use it.
+Consumers must not modify these frames in place. Sources that are not yet
+cached are downloaded concurrently.
+'''
+
+source_cache = cachetools.TTLCache(maxsize=len(SOURCES), ttl=600)
+source_lock = threading.Lock()
+fetch_pool = ThreadPoolExecutor(max_workers=MAX_FETCH_THREADS, thread_name_prefix='jhu-fetch')
+
+
+def fetch(names):
+    '''Get raw data frames for several sources. Returns dict name -> frame'''
+
+    names = list(dict.fromkeys(names))
+
+    # Start downloads for sources that are not cached or in progress
+    with source_lock:
+        futures = {}
+        for name in names:
+            if name not in source_cache:
+                source_cache[name] = fetch_pool.submit(download_source, name)
+            futures[name] = source_cache[name]
+
+    frames = {}
+    for name, future in futures.items():
+        try:
+            frames[name] = future.result()
+        except Exception:
+            # don't cache failures
+            with source_lock:
+                if source_cache.get(name) is future:
+                    del source_cache[name]
+            raise
+    return frames
+
+
+def read_source(name):
+    '''Get raw data frame for one source'''
+    return fetch([name])[name]
+
+
+def prefetch():
+    '''Make sure all sources are in the current snapshot. Returns its name'''
+    fetch(SOURCES)
+    return snapshot_name()
+
+
+'''Loaders'''
+
 @cachetools.func.ttl_cache(ttl=600)
-def load_and_massage(url):
-    df = pd.read_csv(url)
+def load_and_massage(name):
+    df = read_source(name)
     df = df.drop(columns=['Lat', 'Long'])
     df = df.rename(columns={'Province/State' : 'province', 'Country/Region' : 'country'})
     df = df.drop(columns=['province']).groupby('country').sum()
@@ -18,12 +366,13 @@ def load_and_massage(url):
 def load_countries():
 
     sources = {
-        'confirmed' : 'https://github.com/CSSEGISandData/COVID-19/raw/master/csse_covid_19_data/csse_covid_19_time_series/time_series_covid19_confirmed_global.csv',
-        'death' : 'https://github.com/CSSEGISandData/COVID-19/raw/master/csse_covid_19_data/csse_covid_19_time_series/time_series_covid19_deaths_global.csv'
+        'confirmed' : 'confirmed_global',
+        'death' : 'deaths_global'
     }
 
     # Load each data file into a dataframe with row index = date, and column index = (country, province)
-    d = {key: load_and_massage(url) for key, url in sources.items()}
+    fetch(sources.values())
+    d = {key: load_and_massage(name) for key, name in sources.items()}
 
     # Concatenate data frames: column index is now (variable, country)
     df = pd.concat(d.values(), axis=1, keys=d.keys())
@@ -53,9 +402,8 @@ def get_place_info():
 def get_country_info():
     '''Get country info from JHU location lookup file'''
 
-    url = 'https://raw.githubusercontent.com/CSSEGISandData/COVID-19/master/csse_covid_19_data/UID_ISO_FIPS_LookUp_Table.csv'
-    df = pd.read_csv(url, dtype={'FIPS': object})
-    df = df.loc[pd.isnull(df['Province_State'])]
+    df = read_source('lookup')
+    df = df.loc[pd.isnull(df['Province_State'])].copy()
     df['name'] = df['Country_Region']
     df['key'] = df['Country_Region']
     df = df.set_index('key')
@@ -67,8 +415,7 @@ def get_country_info():
 def get_county_info():
     '''Get state info from JHU location lookup file'''
     
-    url = 'https://raw.githubusercontent.com/CSSEGISandData/COVID-19/master/csse_covid_19_data/UID_ISO_FIPS_LookUp_Table.csv'
-    df = pd.read_csv(url, dtype={'FIPS': object})
+    df = read_source('lookup')
     df = filter_counties(df)
 
     # Add county and state columns, and set key to <state abbrev>-<county name>
@@ -82,8 +429,7 @@ def get_county_info():
 def get_state_info():
     '''Get state info from JHU location lookup file'''
     
-    url = 'https://raw.githubusercontent.com/CSSEGISandData/COVID-19/master/csse_covid_19_data/UID_ISO_FIPS_LookUp_Table.csv'
-    df = pd.read_csv(url, dtype={'FIPS': object})
+    df = read_source('lookup')
     df = df.loc[~df['FIPS'].isnull()]
     df = df.loc[df['FIPS'].astype('int') <= 78].copy() # remove counties and others
     df['name'] = df['Province_State']
@@ -101,12 +447,10 @@ def load_us_counties():
 @cachetools.func.ttl_cache(ttl=600)
 def load_us(counties=False):
     
-    baseURL = "https://raw.githubusercontent.com/CSSEGISandData/COVID-19/master/csse_covid_19_data/csse_covid_19_time_series/"
-
-    def load_us_time_series(file):
+    def load_us_time_series(name):
         '''Load data in JHU US time series format (death or confirmed)'''
     
-        df = pd.read_csv(baseURL + file)
+        df = read_source(name)
 
         meta_cols = ['UID',
                      'Lat',
@@ -133,7 +477,7 @@ def load_us(counties=False):
 
         else:
             # group by state
-            df['state'] = df['Province_State'].replace(states.abbrev)
+            df = df.assign(state=df['Province_State'].replace(states.abbrev))
             df = df.drop(columns=meta_cols).groupby('state').sum()
 
         df = df.T
@@ -142,8 +486,9 @@ def load_us(counties=False):
         return df
 
     
-    confirmed = load_us_time_series("time_series_covid19_confirmed_US.csv")
-    deaths = load_us_time_series("time_series_covid19_deaths_US.csv")
+    fetch(["confirmed_US", "deaths_US"])
+    confirmed = load_us_time_series("confirmed_US")
+    deaths = load_us_time_series("deaths_US")
     
     # Combine deaths and confirmed
     df = pd.concat([deaths,confirmed],axis=1,keys=('death','confirmed'))
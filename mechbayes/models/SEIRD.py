@@ -6,11 +6,9 @@ import numpyro
 import numpyro.distributions as dist
 
 from ..compartment import SEIRDModel
-from .util import observe, observe_nb2, ExponentialRandomWalk, LogisticRandomWalk, frozen_random_walk, clean_daily_obs
+from .util import observe, observe_nb2, ExponentialRandomWalk, LogisticRandomWalk, frozen_random_walk
 from .base import SEIRDBase, getter
 
-import numpy as onp
-
 
 """
 ************************************************************
@@ -43,10 +41,17 @@ class SEIRD(SEIRDBase):
                  num_frozen=0,
                  rw_use_last=1,
                  confirmed=None,
-                 death=None):
+                 death=None,
+                 confirmed0=None,
+                 death0=None,
+                 confirmed_mask=None,
+                 death_mask=None):
 
         '''
         Stochastic SEIR model. Draws random parameters and runs dynamics.
+
+        Observations are the first cumulative value (confirmed0, death0) and
+        the daily values with validity masks, as prepared by SEIRDBase.obs.
         '''        
                 
         # Sample initial number of infected individuals
@@ -101,18 +106,6 @@ class SEIRD(SEIRDBase):
         x0 = SEIRDModel.seed(N=N, I=I0, E=E0, H=H0, D=D0)
         numpyro.deterministic("x0", x0)
 
-        # Split observations into first and rest
-        if confirmed is None:
-            confirmed0, confirmed = (None, None)
-        else:
-            confirmed0 = confirmed[0]
-            confirmed = clean_daily_obs(onp.diff(confirmed))
-            
-        if death is None:
-            death0, death = (None, None)
-        else: 
-            death0 = death[0]
-            death = clean_daily_obs(onp.diff(death))
         
         # First observation
         with numpyro.handlers.scale(scale=0.5):
@@ -137,7 +130,9 @@ class SEIRD(SEIRDBase):
                                                 x0,
                                                 num_frozen = num_frozen,
                                                 confirmed = confirmed,
-                                                death = death)
+                                                death = death,
+                                                confirmed_mask = confirmed_mask,
+                                                death_mask = death_mask)
 
         x = np.vstack((x0, x))
         y = np.append(y0, y)
@@ -168,7 +163,7 @@ class SEIRD(SEIRDBase):
         return beta, x, y, z, det_prob, death_prob
     
     
-    def dynamics(self, T, params, x0, num_frozen=0, confirmed=None, death=None, suffix=""):
+    def dynamics(self, T, params, x0, num_frozen=0, confirmed=None, death=None, confirmed_mask=None, death_mask=None, suffix=""):
         '''Run SEIRD dynamics for T time steps'''
 
         beta0, \
@@ -206,10 +201,10 @@ class SEIRD(SEIRDBase):
         
         # Noisy observations
         with numpyro.handlers.scale(scale=0.5):
-            y = observe_nb2("dy" + suffix, new_cases, det_prob, confirmed_dispersion, obs = confirmed)
+            y = observe_nb2("dy" + suffix, new_cases, det_prob, confirmed_dispersion, obs = confirmed, mask = confirmed_mask)
 
         with numpyro.handlers.scale(scale=2.0):
-            z = observe_nb2("dz" + suffix, new_deaths, det_prob_d, death_dispersion, obs = death)  
+            z = observe_nb2("dz" + suffix, new_deaths, det_prob_d, death_dispersion, obs = death, mask = death_mask)  
 
         
         return beta, det_prob, x, y, z
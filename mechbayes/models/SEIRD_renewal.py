@@ -6,11 +6,9 @@ import numpyro
 import numpyro.distributions as dist
 
 from ..compartment import SEIRDModel
-from .util import observe, observe_nb2, LogisticRandomWalk, frozen_random_walk, clean_daily_obs
+from .util import observe, observe_nb2, LogisticRandomWalk, frozen_random_walk
 from .base import SEIRDBase
 
-import numpy as onp
-
 
 def Geometric0(mu):
     '''Geometric RV supported on 0,1,...'''
@@ -159,10 +157,17 @@ class SEIRD(SEIRDBase):
                  num_frozen=0,
                  rw_use_last=1,
                  confirmed=None,
-                 death=None):
+                 death=None,
+                 confirmed0=None,
+                 death0=None,
+                 confirmed_mask=None,
+                 death_mask=None):
 
         '''
         Stochastic SEIR model. Draws random parameters and runs dynamics.
+
+        Observations are the first cumulative value (confirmed0, death0) and
+        the daily values with validity masks, as prepared by SEIRDBase.obs.
         '''        
                 
         # Sample initial time series of exposed individuals and 
@@ -212,18 +217,6 @@ class SEIRD(SEIRDBase):
                                     dist.Gamma(death_rate_shape, death_rate_shape * H_duration_est))
 
 
-        # Split observations into first and rest
-        if confirmed is None:
-            confirmed0, confirmed = (None, None)
-        else:
-            confirmed0 = confirmed[0]  # this is cumulative number of cases by start date
-            confirmed = clean_daily_obs(onp.diff(confirmed))
-            
-        if death is None:
-            death0, death = (None, None)
-        else: 
-            death0 = death[0]
-            death = clean_daily_obs(onp.diff(death))
         
         params = (beta0, 
                   sigma, 
@@ -248,7 +241,9 @@ class SEIRD(SEIRDBase):
                                                            N,
                                                            num_frozen = num_frozen,
                                                            confirmed = confirmed,
-                                                           death = death)
+                                                           death = death,
+                                                           confirmed_mask = confirmed_mask,
+                                                           death_mask = death_mask)
 
         dy = np.append(dy0, dy)
         dz = np.append(dz0, dz)
@@ -280,7 +275,7 @@ class SEIRD(SEIRDBase):
         return beta, det_prob, dE, dI, dD, dy, dz
             
 
-    def dynamics(self, T, params, dE_history, N, num_frozen=0, confirmed=None, death=None, suffix=""):
+    def dynamics(self, T, params, dE_history, N, num_frozen=0, confirmed=None, death=None, confirmed_mask=None, death_mask=None, suffix=""):
         '''Run SEIRD dynamics for T time steps'''
 
         beta0, \
@@ -314,10 +309,10 @@ class SEIRD(SEIRDBase):
 
         # Noisy observations
         with numpyro.handlers.scale(scale=0.5):
-            dy = observe_nb2("dy" + suffix, dI[-T:], det_prob[-T:], confirmed_dispersion, obs = confirmed)
+            dy = observe_nb2("dy" + suffix, dI[-T:], det_prob[-T:], confirmed_dispersion, obs = confirmed, mask = confirmed_mask)
 
         with numpyro.handlers.scale(scale=2.0):
-            dz = observe_nb2("dz" + suffix, dD[-T:], det_prob_d, death_dispersion, obs = death)
+            dz = observe_nb2("dz" + suffix, dD[-T:], det_prob_d, death_dispersion, obs = death, mask = death_mask)
 
         return beta, det_prob, dE, dI, dD, dy, dz
     
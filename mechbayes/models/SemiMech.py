@@ -6,7 +6,7 @@ import numpyro
 import numpyro.distributions as dist
 
 from ..compartment import SEIRDModel
-from .util import observe, observe_nb2, ExponentialRandomWalk, LogisticRandomWalk, frozen_random_walk, clean_daily_obs
+from .util import observe, observe_nb2, ExponentialRandomWalk, LogisticRandomWalk, frozen_random_walk
 from .base import SEIRDBase, getter
 
 import numpy as onp
@@ -45,6 +45,10 @@ class SEIRD(SEIRDBase):
                  rw_use_last=1,
                  confirmed=None,
                  death=None,
+                 confirmed0=None,
+                 death0=None,
+                 confirmed_mask=None,
+                 death_mask=None,
                   T_old=None):
 
 
@@ -74,6 +78,9 @@ class SEIRD(SEIRDBase):
  
         '''
         Stochastic SEIR model. Draws random parameters and runs dynamics.
+
+        Observations are the first cumulative value (confirmed0, death0) and
+        the daily values with validity masks, as prepared by SEIRDBase.obs.
         '''        
                 
         # Sample initial number of infected individuals
@@ -133,18 +140,6 @@ class SEIRD(SEIRDBase):
         x0 = SEIRDModel.seed(N=N, I=I0, E=E0, H=H0, D=D0)
         numpyro.deterministic("x0", x0)
 
-        # Split observations into first and rest
-        if confirmed is None:
-            confirmed0, confirmed = (None, None)
-        else:
-            confirmed0 = confirmed[0]
-            confirmed = clean_daily_obs(onp.diff(confirmed))
-            
-        if death is None:
-            death0, death = (None, None)
-        else: 
-            death0 = death[0]
-            death = clean_daily_obs(onp.diff(death))
         
         # First observation
         with numpyro.handlers.scale(scale=0.5):
@@ -172,6 +167,8 @@ class SEIRD(SEIRDBase):
                                                 num_frozen = num_frozen,
                                                 confirmed = confirmed,
                                                 death = death,
+                                                confirmed_mask = confirmed_mask,
+                                                death_mask = death_mask,
                                                  N=N)
 
         x = None#np.vstack((x0, x))
@@ -204,7 +201,7 @@ class SEIRD(SEIRDBase):
 
         return beta, x, y, z, det_prob, death_prob
     
-    def dynamics(self, T, params, x0, num_frozen=0, confirmed=None, death=None, suffix="",N=None):
+    def dynamics(self, T, params, x0, num_frozen=0, confirmed=None, death=None, confirmed_mask=None, death_mask=None, suffix="",N=None):
         '''Run SEIRD dynamics for T time steps'''
 
         beta0, \
@@ -271,16 +268,16 @@ class SEIRD(SEIRDBase):
         # Noisy observations
         with numpyro.handlers.scale(scale=0.5):
             if suffix != "_future":
-                 y = observe_nb2("dy" + suffix, new_cases, det_prob, confirmed_dispersion, obs = confirmed)
+                 y = observe_nb2("dy" + suffix, new_cases, det_prob, confirmed_dispersion, obs = confirmed, mask = confirmed_mask)
             else:
-                 y = observe_nb2("dy" + suffix, new_cases[-28:], det_prob[-28:], confirmed_dispersion, obs = confirmed)
+                 y = observe_nb2("dy" + suffix, new_cases[-28:], det_prob[-28:], confirmed_dispersion, obs = confirmed, mask = confirmed_mask)
 
 
         with numpyro.handlers.scale(scale=2.0):
             if suffix != "_future":
-                z = observe_nb2("dz" + suffix, new_deaths, det_prob_d, death_dispersion, obs = death)
+                z = observe_nb2("dz" + suffix, new_deaths, det_prob_d, death_dispersion, obs = death, mask = death_mask)
             else:
-                z = observe_nb2("dz" + suffix, new_deaths[-28:], det_prob_d, death_dispersion, obs = death)
+                z = observe_nb2("dz" + suffix, new_deaths[-28:], det_prob_d, death_dispersion, obs = death, mask = death_mask)
         return None, det_prob, None, y, z
 
     
@@ -12,6 +12,7 @@ import matplotlib.pyplot as plt
 
 import numpy as onp
 from mechbayes.compartment import SEIRDModel
+from .util import prepare_daily_obs
 
 
 '''Utility to define access method for time varying fields'''
@@ -67,12 +68,14 @@ class Model():
     ***************************************
     """
     
-    def infer(self, num_warmup=1000, num_samples=1000, init_values=None, num_chains=1, rng_key=PRNGKey(1), **args):
+    def infer(self, num_warmup=1000, num_samples=1000, init_values=None, num_chains=1, rng_key=PRNGKey(1), init_strategy=None, **args):
         '''Fit using MCMC'''
         
         args = dict(self.args, **args)
         
-        if init_values is None:
+        if init_strategy is not None:
+            kernel = NUTS(self, init_strategy = init_strategy)
+        elif init_values is None:
             kernel = NUTS(self, init_strategy = numpyro.infer.initialization.init_to_median())
         else:
             kernel = NUTS(self, init_strategy = numpyro.infer.initialization.init_to_value(values=init_values))
@@ -195,30 +198,47 @@ class Model():
     mean_dz = getter('mean_dz')
     
     
-    def plot_samples(self,
-                     samples, 
-                     plot_fields=['y'],
-                     start='2020-03-04',
+    def sample_bands(self,
+                     samples,
+                     field,
                      T=None,
-                     ax=None,          
-                     legend=True,
                      forecast=False,
-                     n_samples=0,
                      intervals=[50, 80, 95]):
         '''
-        Plotting method for SIR-type models. 
+        Median and prediction intervals of field over time. Returns a dict
+        with 'median' (T,), 'intervals', and 'lower' and 'upper' bounds of 
+        each interval (len(intervals), T).
+        '''
+        T_data = self.horizon(samples, forecast=forecast)        
+        T = T_data if T is None else min(T, T_data) 
+
+        x = onp.array(0.0 + self.get(samples, field, forecast=forecast)[:,:T])
+        low = (100. - onp.array(intervals, dtype=float))/2
+        pi = onp.percentile(x, onp.concatenate([low, 100.-low]), axis=0)
+
+        return {'median': onp.median(x, axis=0),
+                'intervals': onp.array(intervals),
+                'lower': pi[:len(intervals)],
+                'upper': pi[len(intervals):]}
+
+
+    def plot_bands(self,
+                   bands,
+                   start='2020-03-04',
+                   T=None,
+                   ax=None,
+                   legend=True):
+        '''
+        Plot medians and prediction intervals from sample_bands (a dict
+        mapping field to bands).
         '''
 
-        
         ax = plt.axes(ax)
 
-        T_data = self.horizon(samples, forecast=forecast)        
-        T = T_data if T is None else min(T, T_data) 
-        
-        fields = {f: 0.0 + self.get(samples, f, forecast=forecast)[:,:T] for f in plot_fields}
-        names = {f: self.names[f] for f in plot_fields}
-                
-        medians = {names[f]: onp.median(onp.array(v), axis=0) for f, v in fields.items()}
+        T = min(len(b['median']) for b in bands.values()) if T is None else T
+        names = {f: self.names[f] for f in bands}
+
+        medians = {names[f]: b['median'][:T] for f, b in bands.items()}
 
         t = pd.date_range(start=start, periods=T, freq='D')
 
@@ -230,57 +250,106 @@ class Model():
         df.plot(ax=ax, legend=legend)
         median_max = df.max().values
 
-        # Plot samples if requested
-        if n_samples > 0:
-            for i, f in enumerate(fields):
-                df = pd.DataFrame(index=t, data=fields[f][:n_samples,:].T)
-                df.plot(ax=ax, legend=False, alpha=0.1)
-                
         # Plot prediction intervals
         pi_max = 10
         handles = []
-        for interval in intervals:
-            low=(100.-interval)/2
-            high=100.-low
-            pred_intervals = {names[f]: onp.percentile(onp.array(v), (low, high), axis=0) for f, v in fields.items()}
-            for i, pi in enumerate(pred_intervals.values()):
-                h = ax.fill_between(t, pi[0,:], pi[1,:], alpha=0.1, color=colors[i], label=interval)
+        for j, interval in enumerate(next(iter(bands.values()))['intervals']):
+            for i, b in enumerate(bands.values()):
+                lower, upper = b['lower'][j,:T], b['upper'][j,:T]
+                h = ax.fill_between(t, lower, upper, alpha=0.1, color=colors[i], label=interval)
                 handles.append(h)
-                pi_max = onp.maximum(pi_max, onp.nanmax(pi[1,:]))
+                pi_max = onp.maximum(pi_max, onp.nanmax(upper))
+
+        return median_max, pi_max
+
+
+    def plot_samples(self,
+                     samples, 
+                     plot_fields=['y'],
+                     start='2020-03-04',
+                     T=None,
+                     ax=None,          
+                     legend=True,
+                     forecast=False,
+                     n_samples=0,
+                     intervals=[50, 80, 95]):
+        '''
+        Plotting method for SIR-type models. 
+        '''
+
+        ax = plt.axes(ax)
+
+        bands = {f: self.sample_bands(samples, f, T=T, forecast=forecast, intervals=intervals) for f in plot_fields}
+        median_max, pi_max = self.plot_bands(bands, start=start, ax=ax, legend=legend)
+
+        # Plot samples if requested
+        if n_samples > 0:
+            T = len(next(iter(bands.values()))['median'])
+            t = pd.date_range(start=start, periods=T, freq='D')
+            for f in plot_fields:
+                df = pd.DataFrame(index=t, data=onp.array(self.get(samples, f, forecast=forecast))[:n_samples,:T].T)
+                df.plot(ax=ax, legend=False, alpha=0.1)
 
-        
         return median_max, pi_max
     
-    
+
+    def forecast_bands(self,
+                       variable,
+                       post_pred_samples,
+                       forecast_samples,
+                       T_future=None,
+                       intervals=[50, 80, 95]):
+        '''Bands of variable for plot_forecast: in-sample and forecast'''
+        return {'in_sample': self.sample_bands(post_pred_samples, variable, intervals=intervals),
+                'forecast': self.sample_bands(forecast_samples, variable, T=T_future, forecast=True, intervals=intervals)}
+
+
     def plot_forecast(self,
                       variable,
-                      post_pred_samples, 
+                      post_pred_samples=None, 
                       forecast_samples=None,
                       start='2020-03-04',
                       T_future=7*4,
                       ax=None,
                       obs=None,
                       scale='lin',
+                      bands=None,
                       **kwargs):
+        '''
+        Plot in-sample posterior predictive and forecast of variable, either
+        from samples or from precomputed forecast_bands.
+        '''
 
         ax = plt.axes(ax)
         
         # Plot posterior predictive for observed times
-        median_max1, pi_max1 = self.plot_samples(post_pred_samples, ax=ax, start=start, plot_fields=[variable])
+        if bands is None:
+            median_max1, pi_max1 = self.plot_samples(post_pred_samples, ax=ax, start=start, plot_fields=[variable])
+            T = self.horizon(post_pred_samples)
+        else:
+            median_max1, pi_max1 = self.plot_bands({variable: bands['in_sample']}, start=start, ax=ax)
+            T = len(bands['in_sample']['median'])
                 
         # Plot forecast
-        T = self.horizon(post_pred_samples)
         obs_end = pd.to_datetime(start) + pd.Timedelta(T-1, "d")
         forecast_start = obs_end + pd.Timedelta("1d")
         
-        median_max2, pi_max2 = self.plot_samples(forecast_samples,
-                                                 start=forecast_start,
-                                                 T=T_future,
-                                                 ax=ax,
-                                                 forecast=True,
-                                                 legend=False,
-                                                 plot_fields=[variable],
-                                                 **kwargs)
+        if bands is None:
+            median_max2, pi_max2 = self.plot_samples(forecast_samples,
+                                                     start=forecast_start,
+                                                     T=T_future,
+                                                     ax=ax,
+                                                     forecast=True,
+                                                     legend=False,
+                                                     plot_fields=[variable],
+                                                     **kwargs)
+        else:
+            T_future = min(T_future, len(bands['forecast']['median']))
+            median_max2, pi_max2 = self.plot_bands({variable: bands['forecast']},
+                                                   start=forecast_start,
+                                                   T=T_future,
+                                                   ax=ax,
+                                                   legend=False)
         
         median_max = max(median_max1, median_max2)
         pi_max = max(pi_max1, pi_max2)
@@ -325,10 +394,15 @@ class SEIRDBase(Model):
         if self.data is None:
             return {}
 
-        return {
-            'confirmed': self.data['confirmed'].values,
-            'death': self.data['death'].values
-           }
+        # Preprocess once per model instance, not each time the model is traced
+        if getattr(self, '_obs_data', None) is not self.data:
+            obs = {}
+            for var in ['confirmed', 'death']:
+                first, daily, mask = prepare_daily_obs(self.data[var].values)
+                obs.update({f'{var}0': first, var: daily, f'{var}_mask': mask})
+            self._obs, self._obs_data = obs, self.data
+
+        return self._obs
     
 
     # dy and dz are the native variables of the model: incident
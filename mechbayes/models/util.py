@@ -152,13 +152,16 @@ def observe_poisson(name, latent, det_prob, obs=None):
     return y
 
 
-def observe_nb2(name, latent, det_prob, dispersion, obs=None):
+def observe_nb2(name, latent, det_prob, dispersion, obs=None, mask=None):
+    '''Observe NB2 counts. If mask is given, obs is assumed to be zero where mask is False'''
 
-    mask = True
-    if obs is not None:
+    if obs is not None and mask is None:
         mask = np.isfinite(obs) & (obs >= 0.0)
         obs = np.where(mask, obs, 0.0)
 
+    if mask is None:
+        mask = True
+
     # --> gives error with newer jax/numpyro (on swarm2, with numpyro.enable_x64())
     #if onp.any(np.logical_not(mask)):
     #    warnings.warn('Some observed values are invalid')
@@ -236,6 +239,19 @@ def clean_daily_obs(obs, radius=2):
     return orig_obs
 
 
+def prepare_daily_obs(cumulative):
+    '''Split cumulative observations into first value and cleaned daily values
+
+    Returns (first, daily, mask). Invalid daily values (missing or negative
+    after cleaning) have mask False and are set to zero, so the arrays can be
+    passed to the model and observe_nb2 as they are.
+    '''
+    cumulative = onp.array(cumulative, dtype='float')
+    daily = clean_daily_obs(onp.diff(cumulative))
+    mask = onp.isfinite(daily) & (daily >= 0)
+    return cumulative[0], onp.where(mask, daily, 0.0), mask
+
+
 def get_future_data(data, T, offset=1):
     '''Projects data frame with (place, time) MultiIndex into future by
        repeating final time value for each place'''
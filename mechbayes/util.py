@@ -1,8 +1,16 @@
+import os
 import sys
+import shutil
+import fcntl
+import time
+import json
 import traceback
 import warnings
+from collections import namedtuple
+from collections.abc import Mapping
 
 from . import jhu
+from . import states
 
 import mechbayes.models.SEIRD
 
@@ -16,6 +24,7 @@ import jax.numpy as np
 from jax.random import PRNGKey
 
 import numpyro
+import numpyro.diagnostics
 from numpyro.infer import MCMC, NUTS, Predictive
 
 from pathlib import Path
@@ -37,61 +46,265 @@ Data
 ************************************************************
 """
 
+class Panel(Mapping):
+    '''Array-backed data for a set of places
+
+    All data is in one array of shape (places, dates, variables), with
+    index maps for places and dates and a population vector. For
+    compatibility with code written for the dict-of-dicts format, a panel
+    can be indexed by place:
+
+        panel[place]['data']    # DataFrame (a view into the array)
+        panel[place]['pop']
+        panel[place]['name']
+
+    Per-place data frames share memory with the panel, so changes to them
+    (e.g., by data cleaning) change the panel.
+    '''
+
+    variables = ['confirmed', 'death']
+
+    def __init__(self, places, dates, values, pop, names):
+        self.places = list(places)
+        self.place_index = {place: i for i, place in enumerate(self.places)}
+        self.dates = pd.DatetimeIndex(dates)
+        self.values = values
+        self.pop = onp.asarray(pop)
+        self.names = list(names)
+        self._views = {}
+
+    @classmethod
+    def from_frame(cls, df, info):
+        '''Construct from JHU data frame with (place, variable) column index'''
+
+        info = info.loc[~info.index.duplicated()]
+        places = sorted(set(info.index) & set(df.columns.unique(level=0)))
+
+        columns = pd.MultiIndex.from_product([places, cls.variables])
+        values = df.reindex(columns=columns).values.astype('float')
+        values = values.reshape(len(df), len(places), len(cls.variables))
+        values = onp.ascontiguousarray(values.transpose(1, 0, 2))
+
+        return cls(places,
+                   df.index,
+                   values,
+                   info.loc[places, 'Population'].values,
+                   info.loc[places, 'name'].values)
+
+    @classmethod
+    def concat(cls, panels):
+        '''Combine panels. Later panels take precedence for duplicate places'''
+
+        sources = {}
+        for panel in panels:
+            panel.sync()
+            for place in panel.places:
+                sources[place] = panel
+
+        places = list(sources)
+        dates = panels[0].dates
+        for panel in panels[1:]:
+            dates = dates.union(panel.dates)
+
+        values = onp.full((len(places), len(dates), len(cls.variables)), onp.nan)
+        pop = onp.zeros(len(places))
+        names = []
+        for i, place in enumerate(places):
+            panel = sources[place]
+            j = panel.place_index[place]
+            values[i, dates.get_indexer(panel.dates)] = panel.values[j]
+            pop[i] = panel.pop[j]
+            names.append(panel.names[j])
+
+        return cls(places, dates, values, pop, names)
+
+    def view(self, place):
+        '''Get data frame for one place without copying'''
+        i = self.place_index[place]
+        return pd.DataFrame(self.values[i], index=self.dates, columns=self.variables, copy=False)
+
+    def shares_memory(self, place, df):
+        '''Check if each variable column of df is still a view into the array'''
+        values = self.values[self.place_index[place]]
+        return all(var in df and onp.shares_memory(values[:, k], df[var].values)
+                   for k, var in enumerate(self.variables))
+
+    def sync(self):
+        '''Copy per-place data frames back into the array
+
+        Only needed if pandas replaced the memory of a data frame instead
+        of writing into the panel; frames that are still views are skipped.
+        '''
+        for place, d in self._views.items():
+            if not self.shares_memory(place, d['data']):
+                self.values[self.place_index[place]] = d['data'][self.variables].values
+
+    def refresh(self):
+        '''Point per-place data frames at the array after it was changed directly
+
+        Frames that are still views already see the change and are kept.
+        '''
+        for place, d in self._views.items():
+            if not self.shares_memory(place, d['data']):
+                d['data'] = self.view(place)
+
+    def find(self, place):
+        '''Get the panel that holds place (or None)'''
+        return self if place in self else None
+
+    def copy(self):
+        self.sync()
+        return type(self)(self.places, self.dates, self.values.copy(), self.pop, self.names)
+
+    def save(self, filename):
+        '''Save to <filename>.npy (values) and <filename>.json (index)'''
+        self.sync()
+        filename = Path(filename)
+        filename.parent.mkdir(parents=True, exist_ok=True)
+
+        index = {'shape': list(self.values.shape),
+                 'places': self.places,
+                 'dates': [str(d.date()) for d in self.dates],
+                 'pop': self.pop.tolist(),
+                 'names': [str(name) for name in self.names]}
+
+        # write to temporary files and move into place: processes that have
+        # the old files mapped keep reading the old version
+        tmp = filename.with_name(f'.{filename.name}.{os.getpid()}')
+        onp.save(f'{tmp}.npy', onp.ascontiguousarray(self.values))
+        with open(f'{tmp}.json', 'w') as f:
+            json.dump(index, f)
+        os.replace(f'{tmp}.npy', f'{filename}.npy')
+        os.replace(f'{tmp}.json', f'{filename}.json')
+
+    @classmethod
+    def load(cls, filename, mmap_mode='c'):
+        '''Load panel saved by save. By default, values are memory-mapped copy-on-write'''
+        with open(f'{filename}.json') as f:
+            index = json.load(f)
+        values = onp.load(f'{filename}.npy', mmap_mode=mmap_mode)
+        if list(values.shape) != index['shape']:
+            raise ValueError(f"Data file {filename}.npy does not match its index (was it replaced while loading?)")
+        return cls(index['places'], pd.to_datetime(index['dates']), values, index['pop'], index['names'])
+
+    def __getitem__(self, place):
+        if place not in self._views:
+            i = self.place_index[place]
+            self._views[place] = {'data': self.view(place),
+                                  'pop': self.pop[i],
+                                  'name': self.names[i]}
+        return self._views[place]
+
+    def __contains__(self, place):
+        return place in self.place_index
+
+    def __iter__(self):
+        return iter(self.places)
+
+    def __len__(self):
+        return len(self.places)
+
+
 def load_country_data():
 
     countries = jhu.load_countries()
     info = jhu.get_country_info()
     
-    names = set(info.index) & set(countries.columns.unique(level=0))
-    
-    country_data = {
-        k: {'data' : countries[k].copy(), 
-            'pop' : info.loc[k, 'Population'],
-            'name' : info.loc[k, 'name']}
-        for k in names
-    }
-      
-    return country_data
+    return Panel.from_frame(countries, info)
 
 def load_state_data():
 
     states = jhu.load_us_states()
     info = jhu.get_state_info()
 
-    names = set(info.index) & set(states.columns.unique(level=0))
-
-    data = {
-        k : {'data': states[k].copy(), 
-             'pop': info.loc[k, 'Population'],
-             'name': info.loc[k, 'name']
-            }
-        for k in names
-    }
-    
-    return data
+    return Panel.from_frame(states, info)
 
 def load_county_data():
     US = jhu.load_us_counties()
     info = jhu.get_county_info()
     
-    counties = set(info.index) & set(US.columns.unique(level=0))
-    
-    data = {
-        k : {'data': US[k].copy(), 
-             'pop': info.loc[k, 'Population'],
-             'name': info.loc[k, 'name']
-            }
-        for k in counties
-    }
-    
-    return data
+    return Panel.from_frame(US, info)
+
+
+# Data sources in order of precedence for places that appear in more than one
+DATA_SOURCES = ['county', 'state', 'country']
+
+def source_candidates(place):
+    '''Sources that may contain place, in order of precedence'''
+    state, _, county = place.partition('-')
+    if county and state in states.states_territories:
+        return ['county']
+    if place in states.states_territories:
+        return ['state']
+    return ['state', 'country']
+
+
+class LazyData(Mapping):
+    '''Place data that loads each source (US counties, US states, countries) on first use
+
+    Behaves like the panel of all places returned by concatenating the
+    sources, but fitting or scoring a few places only loads the sources
+    those places come from.
+    '''
+
+    loaders = {'county': load_county_data,
+               'state': load_state_data,
+               'country': load_country_data}
+
+    def __init__(self, sources=None):
+        self.sources = [s for s in DATA_SOURCES if sources is None or s in sources]
+        self.panels = {}
 
+    def panel(self, source):
+        if source not in self.panels:
+            self.panels[source] = self.loaders[source]()
+        return self.panels[source]
 
-def load_data():
-    state_data = load_state_data()
-    country_data = load_country_data()
-    county_data = load_county_data()
-    return dict(country_data, **state_data, **county_data)
+    def find(self, place):
+        '''Get the panel that holds place (or None)'''
+        for source in source_candidates(place):
+            if source in self.sources and place in self.panel(source):
+                return self.panel(source)
+        return None
+
+    def copy(self):
+        data = type(self)(self.sources)
+        data.panels = {source: panel.copy() for source, panel in self.panels.items()}
+        return data
+
+    def to_panel(self):
+        '''Combine the sources loaded so far into one panel'''
+        loaded = [self.panels[s] for s in reversed(self.sources) if s in self.panels]
+        return Panel.concat(loaded)
+
+    def __getitem__(self, place):
+        panel = self.find(place)
+        if panel is None:
+            raise KeyError(place)
+        return panel[place]
+
+    def __contains__(self, place):
+        return self.find(place) is not None
+
+    def __iter__(self):
+        places = []
+        for source in reversed(self.sources):
+            places.extend(self.panel(source).places)
+        return iter(dict.fromkeys(places))
+
+    def __len__(self):
+        return sum(1 for place in self)
+
+
+def load_data(places=None):
+    '''Get data for all places, loading each source on first access
+
+    If places is given, only the sources these places can come from are used.
+    '''
+    sources = None
+    if places is not None:
+        sources = {source for place in places for source in source_candidates(place)}
+    return LazyData(sources)
 
 
 def redistribute(df, date, n, k, col='death'):
@@ -132,6 +345,129 @@ def redistribute(df, date, n, k, col='death'):
     df.loc[days, col] += new_cumulative
 
 
+# Adjustment table entries other than redistributions, which are plain
+# (place, col, date, n, k) tuples with the meaning of redistribute()
+
+# Add value to cumulative counts from start to end (inclusive)
+Offset = namedtuple('Offset', ['place', 'col', 'start', 'end', 'value'])
+
+# Set cumulative counts to values for consecutive days beginning on start
+Assign = namedtuple('Assign', ['place', 'col', 'start', 'values'])
+
+
+def apply_adjustments(data, adjustments):
+    '''Apply a table of adjustments to panel-backed data at once
+
+    The result is the same as applying the entries one after another. All
+    changes are collected as sparse (place, date, variable, delta) arrays and
+    added to each panel in one vectorized operation. Raises ValueError if an
+    entry falls outside the data, or if the adjustments would change the
+    cumulative total of any place on the last date.
+    '''
+
+    # Panel, place index and variable index of each entry
+    panels = []
+    entries = []
+    for order, a in enumerate(adjustments):
+        panel = data.find(a[0])
+        if panel is None:
+            raise KeyError(a[0])
+        if not any(panel is p for p in panels):
+            panels.append(panel)
+        pid = next(i for i, p in enumerate(panels) if p is panel)
+        entries.append((order, pid, panel.place_index[a[0]], panel.variables.index(a[1]), a))
+
+    def date_index(panel, dates, items):
+        inds = panel.dates.get_indexer(pd.to_datetime(dates))
+        if onp.any(inds < 0):
+            bad = [items[i] for i in onp.flatnonzero(inds < 0)]
+            raise ValueError(f"Adjustments outside the range of the data: {bad}")
+        return inds
+
+    # Sparse deltas: one row per (entry, day)
+    cells = {'order': [], 'pid': [], 'place': [], 'date': [], 'var': [], 'delta': []}
+
+    def add_cells(order, pid, place, date, var, delta):
+        for key, value in zip(cells, (order, pid, place, date, var, delta)):
+            cells[key].append(onp.broadcast_to(value, onp.shape(date)))
+
+    # Redistributions (vectorized over entries)
+    redist = [e for e in entries if not isinstance(e[4], (Offset, Assign))]
+    if redist:
+        order, pid, place, var = (onp.array(x) for x in list(zip(*redist))[:4])
+        n = onp.array([e[4][3] for e in redist], dtype='int64')
+        k = onp.array([e[4][4] for e in redist], dtype='int64')
+        date = onp.zeros(len(redist), dtype='int64')
+        for i, panel in enumerate(panels):
+            sel = onp.flatnonzero(pid == i)
+            items = [redist[s][4] for s in sel]
+            date[sel] = date_index(panel, [item[2] for item in items], items)
+
+        ndays = onp.abs(k)
+        a, b = n // ndays, n % ndays
+        length = ndays + 1
+        start = onp.where(k > 0, date - ndays, date)
+
+        # position j within the window of each entry
+        rep = lambda x: onp.repeat(x, length)
+        j = onp.arange(length.sum()) - rep(onp.cumsum(length) - length)
+
+        # cumulative sum of the redistributed incident counts (see redistribute)
+        forward = rep(k > 0)
+        m = onp.where(forward, j + 1, j)
+        delta = onp.where(forward, 0, -rep(n)) + rep(a) * m + onp.minimum(m, rep(b))
+        delta[forward & (j == rep(ndays))] = 0
+
+        end = start + ndays
+        num_dates = onp.array([len(panels[i].dates) for i in pid])
+        outside = (start < 0) | (end >= num_dates)
+        if onp.any(outside):
+            bad = [redist[i][4] for i in onp.flatnonzero(outside)]
+            raise ValueError(f"Adjustments outside the range of the data: {bad}")
+
+        add_cells(rep(order), rep(pid), rep(place), rep(start) + j, rep(var), delta)
+
+    # Offsets
+    for order, pid, place, var, a in entries:
+        if isinstance(a, Offset):
+            dates = pd.date_range(a.start, a.end)
+            days = date_index(panels[pid], dates, [a] * len(dates))
+            add_cells(order, pid, place, days, var, onp.full(len(days), a.value))
+
+    cells = {key: onp.concatenate(value) if value else onp.array([], dtype='int64') for key, value in cells.items()}
+
+    # Assignments replace the raw value and all earlier deltas of their days
+    assignments = []
+    for order, pid, place, var, a in entries:
+        if isinstance(a, Assign):
+            dates = pd.date_range(a.start, periods=len(a.values))
+            days = date_index(panels[pid], dates, [a] * len(dates))
+            earlier = (cells['order'] < order) & (cells['pid'] == pid) & (cells['place'] == place) \
+                & (cells['var'] == var) & onp.isin(cells['date'], days)
+            cells = {key: value[~earlier] for key, value in cells.items()}
+            assignments.append((pid, place, days, var, a.values))
+
+    for i, panel in enumerate(panels):
+        sel = cells['pid'] == i
+        place, date, var, delta = (cells[key][sel] for key in ['place', 'date', 'var', 'delta'])
+
+        # Check that cumulative totals on the last date are unchanged
+        last = date == len(panel.dates) - 1
+        totals = onp.zeros((len(panel.places), len(panel.variables)))
+        onp.add.at(totals, (place[last], var[last]), delta[last])
+        bad = onp.argwhere(totals != 0)
+        if len(bad):
+            changed = [(panel.places[p], panel.variables[v]) for p, v in bad]
+            raise ValueError(f"Adjustments change cumulative totals of {changed}")
+
+        panel.sync()
+        for j, p, days, v, values in assignments:
+            if j == i:
+                panel.values[p, days, v] = values
+        onp.add.at(panel.values, (place, date, var), delta)
+        panel.refresh()
+
+
 def set_trailing_weekend_zeros_to_missing(data,
                                           forecast_date,
                                           no_sunday_data_places,
@@ -189,45 +525,81 @@ def set_trailing_weekend_zeros_to_missing(data,
 
 
 def smooth_to_weekly(data, forecast_date, place, var, start_date, end_date=None):
-
-    to_date = end_date or forecast_date
-    
-    series = data[place]['data'][var]
-    
-    reporting_dates = pd.date_range(start=start_date, end=to_date, freq=pd.Timedelta('1w'))
-
-    for reporting_date in reporting_dates:
-        
-        # get total cases/deaths for week
-        right = reporting_date
-        left = reporting_date - pd.Timedelta("1w")
-        cum_tot = series[right]
-        weekly_tot = series[right] - series[left]
-        
-        # construct incident time series with cases/deaths
-        # spread evenly through week
-        avg = int(weekly_tot // 7)
-        rem = int(weekly_tot % 7)        
-
-        # set each day equal to floor(average)
-        incident = avg * onp.ones(7)
-
-        # add remainder by adding 1 for first rem days in scrambled order
-        scrambled_days = [3, 0, 6, 2, 5, 4, 1]
-        incident[scrambled_days[:rem]] += 1   
-        
-        # now reconstruct cumulative series from incident
-        series[left+pd.Timedelta("1d"):right] = series[left] + onp.cumsum(incident)        
-        
-        assert(series[right] - series[left] == weekly_tot)
-        assert(series[right] == cum_tot)
-    
-    # if we didn't explicitly stop smoothing (e.g., because location
-    # went back to daily reporting), assume all observations after
-    # final weekly reporting date are missing
-    if end_date is None and len(reporting_dates) > 0:
-        last_reporting_date = reporting_dates[-1]
-        series[last_reporting_date + pd.Timedelta('1d'):] = onp.nan
+    '''Smooth observations of one place that reports once / week (see smooth_to_weekly_batch)'''
+    smooth_to_weekly_batch(data, forecast_date, [(place, var, start_date, end_date)])
+
+
+# Order in which the remainder of a weekly total is added to days of the week
+SCRAMBLED_DAYS = [3, 0, 6, 2, 5, 4, 1]
+
+def smooth_to_weekly_batch(data, forecast_date, specs):
+    '''Smooth observations to weekly for several places at once
+
+    Each spec is (place, var, start_date) or (place, var, start_date, end_date).
+    Reporting happens once / week starting on start_date. For each reporting
+    date, the total reported over the preceding week is spread evenly across
+    the days, with the remainder added one at a time in a scrambled order of
+    days. Cumulative values on reporting dates do not change.
+
+    If end_date is not given, observations after the last reporting date
+    are set to missing. Modifies panel-backed data in place.
+    '''
+
+    # rank[d] < rem if day d of the week gets one of the rem remainder counts
+    rank = onp.argsort(SCRAMBLED_DAYS)
+    days = onp.arange(7)
+
+    groups = {}
+    for spec in specs:
+        place, var, start_date = spec[:3]
+        end_date = spec[3] if len(spec) > 3 else None
+
+        panel = data.find(place)
+        if panel is None:
+            raise KeyError(place)
+
+        to_date = end_date or forecast_date
+        reporting_dates = pd.date_range(start=start_date, end=to_date, freq=pd.Timedelta('1w'))
+        right = panel.dates.get_indexer(reporting_dates)
+        if onp.any(right < 7):
+            raise ValueError(f"Weekly reporting for {place} {var} is outside the range of the data")
+
+        groups.setdefault(id(panel), (panel, []))[1].append(
+            (panel.place_index[place], panel.variables.index(var), right, end_date is None))
+
+    for panel, rows in groups.values():
+        panel.sync()
+        values = panel.values
+
+        # One row per (series, reporting date)
+        p = onp.concatenate([onp.full(len(r), i) for i, j, r, trailing in rows]).astype(int)
+        v = onp.concatenate([onp.full(len(r), j) for i, j, r, trailing in rows]).astype(int)
+        right = onp.concatenate([r for i, j, r, trailing in rows]).astype(int)
+        left = right - 7
+
+        # get total cases/deaths for each week
+        cum_tot = values[p, right, v]
+        weekly_tot = cum_tot - values[p, left, v]
+        if not onp.all(onp.isfinite(weekly_tot)):
+            raise ValueError("Missing values on weekly reporting dates")
+
+        # spread evenly through week and reconstruct cumulative series
+        avg = weekly_tot // 7
+        rem = weekly_tot % 7
+        extra = onp.cumsum(rank[None, :] < rem[:, None], axis=1)
+        cumulative = values[p, left, v][:, None] + avg[:, None] * (days + 1) + extra
+
+        assert onp.all(cumulative[:, -1] == cum_tot)
+        values[p[:, None], left[:, None] + 1 + days, v[:, None]] = cumulative
+
+        # if we didn't explicitly stop smoothing (e.g., because location
+        # went back to daily reporting), assume all observations after
+        # final weekly reporting date are missing
+        for i, j, r, trailing in rows:
+            if trailing and len(r) > 0:
+                values[i, r[-1] + 1:, j] = onp.nan
+
+        panel.refresh()
 
             
 """
@@ -254,22 +626,34 @@ def plot_R0(mcmc_samples, start, ax=None):
     ax.axhline(1, linestyle='--')
     
 
-def plot_growth_rate(mcmc_samples, start, model=SEIRModel, ax=None):
-    
-    ax = plt.axes(ax)
+def growth_rate_bands(mcmc_samples):
+    '''Median and 10-90 percentile band of the growth rate over time'''
 
-    # Compute growth rate over time
     beta = mcmc_samples['beta']
     sigma = mcmc_samples['sigma'][:,None]
     gamma = mcmc_samples['gamma'][:,None]
-    t = pd.date_range(start=start, periods=beta.shape[1], freq='D')
 
     growth_rate = SEIRModel.growth_rate((beta, sigma, gamma))
 
     pi = onp.percentile(growth_rate, (10, 90), axis=0)
-    df = pd.DataFrame(index=t, data={'growth_rate': onp.median(growth_rate, axis=0)})
+    return {'median': onp.median(growth_rate, axis=0),
+            'intervals': onp.array([80]),
+            'lower': pi[:1],
+            'upper': pi[1:]}
+
+
+def plot_growth_rate(mcmc_samples, start, model=SEIRModel, ax=None, bands=None):
+    
+    ax = plt.axes(ax)
+
+    # Compute growth rate over time
+    if bands is None:
+        bands = growth_rate_bands(mcmc_samples)
+    t = pd.date_range(start=start, periods=len(bands['median']), freq='D')
+
+    df = pd.DataFrame(index=t, data={'growth_rate': bands['median']})
     df.plot(style='-o', ax=ax)
-    ax.fill_between(t, pi[0,:], pi[1,:], alpha=0.1)
+    ax.fill_between(t, bands['lower'][0,:], bands['upper'][0,:], alpha=0.1)
 
     ax.axhline(0, linestyle='--')
     
@@ -297,6 +681,9 @@ def run_place(data,
               resample_low=0,
               resample_high=100,
               save_fields=['beta0', 'beta', 'sigma', 'gamma', 'dy0', 'dy', 'dy_future', 'dz0', 'dz', 'dz_future', 'y0', 'y', 'y_future', 'z0', 'z', 'z_future' ],
+              fit_checks=None,
+              archive=False,
+              sample_storage=None,
               **kwargs):
 
 
@@ -306,49 +693,95 @@ def run_place(data,
     place_data = data[place]['data'][start:end]
     T = len(place_data)
 
-    model = model_type(
-        data = place_data,
-        T = T,
-        N = data[place]['pop'],
-        **kwargs
-    )
-    
-    print(" * running MCMC")
-    mcmc_samples = model.infer(num_warmup=num_warmup, 
-                               num_samples=num_samples,
-                               init_values=init_values)
-
-    if resample_low > 0 or resample_high < 100:
-        print(" * resampling")
-        mcmc_samples = model.resample(low=resample_low, high=resample_high, **kwargs)
-
-    # Prior samples
-    prior_samples = None
-    if num_prior_samples > 0:
-        print(" * collecting prior samples")
-        prior_samples = model.prior(num_samples=num_prior_samples)
-
-    # In-sample posterior predictive samples (don't condition on observations)
-    print(" * collecting in-sample predictive samples")
-    post_pred_samples = model.predictive()
-
-    # Forecasting posterior predictive (do condition on observations)
-    print(" * collecting forecast samples")
-    forecast_samples = model.forecast(T_future=T_future)
+    # Fits are checked against the thresholds in fit_checks and retried
+    # (up to max_attempts) with a new seed, initialization and more warmup
+    fit_checks = fit_checks or {}
+    max_attempts = fit_checks.get('max_attempts', 1)
+    attempts = []
+
+    for attempt in range(max_attempts):
+
+        attempt_start = time.time()
+        settings = retry_settings(attempt, num_warmup, fit_checks)
+        last_attempt = attempt == max_attempts - 1
+
+        model = model_type(
+            data = place_data,
+            T = T,
+            N = data[place]['pop'],
+            **kwargs
+        )
+
+        print(f" * running MCMC (attempt {attempt+1} of {max_attempts})")
+        init_strategy = settings['init_strategy']
+        mcmc_samples = model.infer(num_warmup=settings['num_warmup'], 
+                                   num_samples=num_samples,
+                                   init_values=init_values,
+                                   rng_key=PRNGKey(settings['seed']),
+                                   init_strategy=init_strategy and getattr(numpyro.infer.initialization, init_strategy)())
+
+        # Check MCMC diagnostics before spending time on predictive samples
+        diagnostics = fit_diagnostics(model.mcmc)
+        failures = check_fit(diagnostics, fit_checks)
+
+        if not failures or last_attempt:
+
+            if resample_low > 0 or resample_high < 100:
+                print(" * resampling")
+                mcmc_samples = model.resample(low=resample_low, high=resample_high, **kwargs)
+
+            # Prior samples
+            prior_samples = None
+            if num_prior_samples > 0:
+                print(" * collecting prior samples")
+                prior_samples = model.prior(num_samples=num_prior_samples)
+
+            # In-sample posterior predictive samples (don't condition on observations)
+            print(" * collecting in-sample predictive samples")
+            post_pred_samples = model.predictive()
+
+            # Forecasting posterior predictive (do condition on observations)
+            print(" * collecting forecast samples")
+            forecast_samples = model.forecast(T_future=T_future)
+
+            diagnostics['nan_forecasts'] = count_nan_draws(forecast_samples)
+            failures = check_fit(diagnostics, fit_checks)
+
+        attempts.append(dict(attempt=attempt+1,
+                             **settings,
+                             **diagnostics,
+                             failures=failures,
+                             time=time.time()-attempt_start))
+
+        if not failures:
+            break
+
+        print(f" * fit check failed: {', '.join(failures)}")
+
+    if failures:
+        warnings.warn(f"{place}: fit checks failed after {max_attempts} attempts: {', '.join(failures)}")
         
     if save:
 
         # Save samples
         path = Path(prefix) / 'samples'
         path.mkdir(mode=0o775, parents=True, exist_ok=True)
-        filename = path / f'{place}.npz'
-        
-        save_samples(filename,
-                     prior_samples,
-                     mcmc_samples, 
-                     post_pred_samples,
-                     forecast_samples,
-                     save_fields=save_fields)
+        if archive:
+            sample_archive(path).append(place,
+                                        prior_samples,
+                                        mcmc_samples,
+                                        post_pred_samples,
+                                        forecast_samples,
+                                        save_fields=save_fields,
+                                        storage=sample_storage)
+        else:
+            save_samples(path / place,
+                         prior_samples,
+                         mcmc_samples, 
+                         post_pred_samples,
+                         forecast_samples,
+                         save_fields=save_fields,
+                         storage=sample_storage)
         
         path = Path(prefix) / 'summary'
         path.mkdir(mode=0o775, parents=True, exist_ok=True)
@@ -356,28 +789,499 @@ def run_place(data,
         
         write_summary(filename, model.mcmc)
 
+        filename = path / f'{place}.json'
+        write_attempts(filename, attempts)
+
+        # Written after the samples, so it is not considered out of date
+        summary = forecast_summary(model, start, mcmc_samples, post_pred_samples, forecast_samples)
+        save_forecast_summary(forecast_summary_path(prefix, place), summary)
+
+    # Names of failed fit checks (empty if the fit passed)
+    return failures
+
+
+# Initialization strategies for retries of failed fits
+RETRY_INIT_STRATEGIES = ['init_to_sample', 'init_to_uniform', 'init_to_median']
+
+def retry_settings(attempt, num_warmup, fit_checks):
+    '''Get seed, init strategy and warmup for a (re)try of a fit
+
+    The first attempt uses the defaults, so results are unchanged when
+    fits pass their checks.
+    '''
+    if attempt == 0:
+        return {'seed': 1, 'init_strategy': None, 'num_warmup': num_warmup}
+
+    warmup_factor = fit_checks.get('warmup_factor', 2)
+    return {'seed': 1 + attempt,
+            'init_strategy': RETRY_INIT_STRATEGIES[(attempt-1) % len(RETRY_INIT_STRATEGIES)],
+            'num_warmup': int(num_warmup * warmup_factor**attempt)}
+
+
+def fit_diagnostics(mcmc):
+    '''Get number of divergences and worst R-hat and ESS over sites'''
+
+    # Only check latent sites (deterministic sites are functions of these)
+    latent_sites = mcmc.last_state.z.keys()
+    samples = mcmc.get_samples(group_by_chain=True)
+    samples = {k: v for k, v in samples.items() if k in latent_sites}
+    summary = numpyro.diagnostics.summary(samples)
+
+    max_rhat = 1.
+    min_ess = onp.inf
+    zero_ess_sites = []
+
+    for site, stats in summary.items():
+
+        # skip elements that are constant (e.g., frozen parts of a random walk)
+        x = onp.asarray(samples[site])
+        varying = onp.std(x.reshape((-1,) + x.shape[2:]), axis=0) > 0
+        if not onp.any(varying):
+            continue
+
+        r_hat = onp.asarray(stats['r_hat'])[varying]
+        n_eff = onp.asarray(stats['n_eff'])[varying]
+        n_eff = onp.where(onp.isfinite(n_eff), onp.maximum(n_eff, 0.), 0.)
+
+        if onp.any(onp.isfinite(r_hat)):
+            max_rhat = max(max_rhat, float(onp.nanmax(r_hat)))
+        min_ess = min(min_ess, float(n_eff.min()))
+        if n_eff.min() < 1:
+            zero_ess_sites.append(site)
+
+    diverging = mcmc.get_extra_fields().get('diverging')
+
+    return {'divergences': 0 if diverging is None else int(onp.sum(diverging)),
+            'max_rhat': max_rhat,
+            'min_ess': min_ess,
+            'zero_ess_sites': zero_ess_sites}
+
+
+def count_nan_draws(samples):
+    '''Number of draws with a non-finite value in any forecast field'''
+    bad = onp.zeros(0, dtype=bool)
+    for k, v in samples.items():
+        if k.endswith('_future'):
+            v = onp.asarray(v)
+            bad_v = ~onp.isfinite(v.reshape(v.shape[0], -1)).all(axis=1)
+            bad = bad_v if len(bad) == 0 else bad | bad_v
+    return int(bad.sum())
+
+
+def check_fit(diagnostics, fit_checks):
+    '''Compare diagnostics to thresholds. Returns list of failures'''
+    
+    failures = []
+    
+    if 'max_divergences' in fit_checks and diagnostics['divergences'] > fit_checks['max_divergences']:
+        failures.append(f"{diagnostics['divergences']} divergences")
+
+    if 'max_rhat' in fit_checks and diagnostics['max_rhat'] > fit_checks['max_rhat']:
+        failures.append(f"R-hat {diagnostics['max_rhat']:.3f}")
+
+    if 'min_ess' in fit_checks and diagnostics['min_ess'] < fit_checks['min_ess']:
+        failures.append(f"ESS {diagnostics['min_ess']:.1f} (zero ESS sites: {diagnostics['zero_ess_sites']})")
+
+    if fit_checks.get('check_nan_forecasts') and diagnostics.get('nan_forecasts', 0) > 0:
+        failures.append(f"{diagnostics['nan_forecasts']} forecast draws with NaN")
+
+    return failures
+
+
+def write_attempts(filename, attempts):
+    '''Write diagnostics and timing of each fit attempt to json file'''
+    file_exists = filename.exists()
+    with open(filename, 'w') as f:
+        json.dump(attempts, f, indent=2)
+    if not file_exists:
+        filename.chmod(0o664)
+
         
+'''Sample store
+
+Samples for one place are saved in a directory with one .npy file per
+(group, field) and a manifest.json that lists them. Fields are loaded
+individually, on first access, and memory-mapped. Earlier versions saved
+all groups as pickled dicts in one compressed .npz file; load_samples
+reads both formats.
+'''
+
+SAMPLE_GROUPS = ['prior_samples', 'mcmc_samples', 'post_pred_samples', 'forecast_samples']
+
+MANIFEST = 'manifest.json'
+
+
+def samples_path(samples_dir, place):
+    '''Path of saved samples for place: a sample store, or an older .npz file
+
+    If both exist, the newer one is used.
+    '''
+    store = Path(samples_dir) / place
+    npz = Path(samples_dir) / f'{place}.npz'
+    if npz.exists() and (not (store / MANIFEST).exists()
+                         or npz.stat().st_mtime > (store / MANIFEST).stat().st_mtime):
+        return npz
+    return store
+
+
+def sample_groups(prior_samples,
+                  mcmc_samples,
+                  post_pred_samples,
+                  forecast_samples,
+                  save_fields=None):
+    '''Dict of sample groups, keeping only save_fields (if given)'''
+
+    def trim(d):
+        if d is not None:
+            d = {k : v for k, v in d.items() if save_fields is None or k in save_fields}
+        return d
+
+    return dict(zip(SAMPLE_GROUPS, map(trim, [prior_samples,
+                                              mcmc_samples,
+                                              post_pred_samples,
+                                              forecast_samples])))
+
+
+'''Storage options for sample fields (decoded transparently when loading):
+
+  'float64'      store as computed (default)
+  'float32'      store float fields as float32
+  'int32'        store fields whose values are all integers (e.g., sampled
+                 counts) as int32, and other float fields as float32
+  'int32-delta'  as 'int32', but store integer fields as differences along
+                 time (axis 1), in the smallest integer type that holds them
+'''
+
+SAMPLE_STORAGE = ['float64', 'float32', 'int32', 'int32-delta']
+
+
+def min_int_dtype(x):
+    '''Smallest integer type (at most int32) that holds the values of x, or None'''
+    lo, hi = (x.min(), x.max()) if x.size else (0, 0)
+    for dtype in [onp.int8, onp.int16, onp.int32]:
+        info = onp.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return dtype
+    return None
+
+
+def encode_field(value, storage=None):
+    '''Encode one field for storage
+
+    Returns the array to store and a dict describing the encoding (or None).
+    '''
+    value = onp.asarray(value)
+    storage = storage or 'float64'
+    if storage not in SAMPLE_STORAGE:
+        raise ValueError(f"Invalid sample storage {storage}; choose from {SAMPLE_STORAGE}")
+
+    if storage == 'float64' or value.dtype.kind != 'f':
+        return value, None
+
+    encoding = {'dtype': str(value.dtype)}
+
+    if storage.startswith('int32') and onp.isfinite(value).all() and (value == onp.round(value)).all():
+        ints = value.astype(onp.int64)
+        if min_int_dtype(ints) is not None:
+            if storage == 'int32-delta' and ints.ndim >= 2:
+                # The first time step is stored relative to its smallest value
+                base = int(ints.take(0, axis=1).min()) if ints.size else 0
+                deltas = onp.diff(ints, axis=1, prepend=base)
+                dtype = min_int_dtype(deltas)
+                if dtype is not None:
+                    encoding.update(delta=1, base=base)
+                    return deltas.astype(dtype), encoding
+            return ints.astype(onp.int32), encoding
+
+    if value.dtype == onp.float32:
+        return value, None
+    return value.astype(onp.float32), encoding
+
+
+def decode_field(stored, encoding=None):
+    '''Inverse of encode_field'''
+    if encoding is None:
+        return stored
+    if 'delta' in encoding:
+        stored = onp.cumsum(stored, axis=encoding['delta'], dtype=onp.int64) + encoding['base']
+    return stored.astype(encoding['dtype'])
+
+
+def field_entry(value, storage=None):
+    '''Encode a field; returns the array to store and its manifest/index entry'''
+    stored, encoding = encode_field(value, storage)
+    entry = {'shape': list(stored.shape), 'dtype': str(stored.dtype)}
+    if encoding is not None:
+        entry['encoding'] = encoding
+    return stored, entry
+
+
 def save_samples(filename, 
                  prior_samples,
                  mcmc_samples, 
                  post_pred_samples,
                  forecast_samples,
-                 save_fields=None):
-    
-
-    def trim(d):
-        if d is not None:
-            d = {k : v for k, v in d.items() if k in save_fields}
-        return d
-    
-    file_exists = filename.exists()
-    onp.savez_compressed(filename, 
-                         prior_samples = trim(prior_samples),
-                         mcmc_samples = trim(mcmc_samples),
-                         post_pred_samples = trim(post_pred_samples),
-                         forecast_samples = trim(forecast_samples))
-    if not file_exists:
-        filename.chmod(0o664)
+                 save_fields=None,
+                 storage=None):
+    '''Save samples to a sample store directory (or an .npz file if filename ends with .npz)
+
+    storage is one of SAMPLE_STORAGE (sample store only).
+    '''
+
+    filename = Path(filename)
+    groups = sample_groups(prior_samples,
+                           mcmc_samples,
+                           post_pred_samples,
+                           forecast_samples,
+                           save_fields=save_fields)
+
+    if filename.suffix == '.npz':
+        if storage not in (None, 'float64'):
+            raise ValueError(f"Sample storage {storage} is not supported for .npz files")
+        file_exists = filename.exists()
+        onp.savez_compressed(filename, **groups)
+        if not file_exists:
+            filename.chmod(0o664)
+        return
+
+    # Write to a temporary directory and move it into place, so readers
+    # never see a partial store
+    tmp = filename.with_name(f'.{filename.name}.{os.getpid()}')
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(mode=0o775)
+
+    manifest = {'version': 1, 'groups': {}}
+    for group, fields in groups.items():
+        if fields is None:
+            manifest['groups'][group] = None
+            continue
+        entries = {}
+        for field, value in fields.items():
+            stored, entry = field_entry(value, storage)
+            entries[field] = {'file': f'{group}.{field}.npy', **entry}
+            onp.save(tmp / entries[field]['file'], stored)
+        manifest['groups'][group] = entries
+
+    with open(tmp / MANIFEST, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    for f in tmp.iterdir():
+        f.chmod(0o664)
+
+    if filename.exists():
+        old = filename.with_name(f'.{filename.name}.{os.getpid()}.old')
+        os.rename(filename, old)
+        os.rename(tmp, filename)
+        shutil.rmtree(old)
+    else:
+        os.rename(tmp, filename)
+
+
+class SampleGroup(Mapping):
+    '''Fields of one group of saved samples, loaded on first access
+
+    fields maps field names to manifest or index entries; load(entry)
+    returns the array for one entry.
+    '''
+
+    def __init__(self, fields, load):
+        self.fields = fields
+        self.load = load
+        self._arrays = {}
+
+    def __getitem__(self, field):
+        if field not in self._arrays:
+            entry = self.fields[field]
+            self._arrays[field] = decode_field(self.load(entry), entry.get('encoding'))
+        return self._arrays[field]
+
+    def __contains__(self, field):
+        return field in self.fields
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
+
+
+'''Sample archive
+
+To avoid thousands of small files per forecast date, samples for all places
+can instead be appended to one archive in the samples directory:
+archive.dat holds the raw bytes of every field, and archive.idx has one JSON
+line per saved place with the offset, shape and dtype of each field. Jobs
+append concurrently while holding an exclusive lock on archive.dat (flock
+also works across nodes on NFS v4). A place that is saved again is
+superseded by its last index line; the old bytes stay in the archive.
+'''
+
+ARCHIVE_DATA = 'archive.dat'
+ARCHIVE_INDEX = 'archive.idx'
+ARCHIVE_ALIGN = 64
+
+
+class SampleArchive:
+
+    def __init__(self, samples_dir):
+        self.data_file = Path(samples_dir) / ARCHIVE_DATA
+        self.index_file = Path(samples_dir) / ARCHIVE_INDEX
+        self._index = {}
+        self._index_size = 0
+
+    def exists(self):
+        return self.index_file.exists()
+
+    def append(self,
+               place,
+               prior_samples,
+               mcmc_samples,
+               post_pred_samples,
+               forecast_samples,
+               save_fields=None,
+               storage=None):
+        '''Append samples for place to the archive (storage is one of SAMPLE_STORAGE)'''
+
+        groups = sample_groups(prior_samples,
+                               mcmc_samples,
+                               post_pred_samples,
+                               forecast_samples,
+                               save_fields=save_fields)
+
+        groups = {group: None if fields is None else
+                  {field: field_entry(value, storage) for field, value in fields.items()}
+                  for group, fields in groups.items()}
+
+        files_exist = self.data_file.exists()
+
+        # 'a' opens with O_APPEND: all writes go to the end of the file
+        with open(self.data_file, 'ab') as data, open(self.index_file, 'a') as index:
+            fcntl.flock(data, fcntl.LOCK_EX)
+            try:
+                offset = data.seek(0, os.SEEK_END)
+                entry = {'place': place, 'time': time.time(), 'groups': {}}
+                for group, fields in groups.items():
+                    if fields is None:
+                        entry['groups'][group] = None
+                        continue
+                    entries = {}
+                    for field, (stored, field_info) in fields.items():
+                        pad = -offset % ARCHIVE_ALIGN
+                        data.write(bytes(pad))
+                        offset += pad
+                        entries[field] = {'offset': offset, **field_info}
+                        data.write(stored.tobytes())
+                        offset += stored.nbytes
+                    entry['groups'][group] = entries
+
+                # Data must be on disk before the index line that points to it
+                data.flush()
+                os.fsync(data.fileno())
+                index.write(json.dumps(entry) + '\n')
+                index.flush()
+            finally:
+                fcntl.flock(data, fcntl.LOCK_UN)
+
+        if not files_exist:
+            self.data_file.chmod(0o664)
+            self.index_file.chmod(0o664)
+
+    def index(self):
+        '''Latest index entry for each place (reads lines appended since the last call)'''
+        if not self.exists():
+            return self._index
+        with open(self.index_file, 'rb') as f:
+            f.seek(self._index_size)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # being written
+                entry = json.loads(line)
+                self._index[entry['place']] = entry
+                self._index_size += len(line)
+        return self._index
+
+    def places(self):
+        return list(self.index())
+
+    def __contains__(self, place):
+        return place in self.index()
+
+    def mtime(self, place):
+        return self.index()[place]['time']
+
+    def read_field(self, entry, mmap_mode='c'):
+        dtype = onp.dtype(entry['dtype'])
+        shape = tuple(entry['shape'])
+        count = int(onp.prod(shape))
+        if count == 0:
+            return onp.empty(shape, dtype)
+        if mmap_mode is None or shape == ():
+            return onp.fromfile(self.data_file, dtype=dtype, count=count, offset=entry['offset']).reshape(shape)
+        return onp.memmap(self.data_file, dtype=dtype, mode=mmap_mode, offset=entry['offset'], shape=shape)
+
+    def load(self, place, mmap_mode='c'):
+        '''Load samples for place (same format as load_samples)'''
+        entry = self.index()[place]
+        load = lambda field: self.read_field(field, mmap_mode)
+        return tuple(None if entry['groups'].get(group) is None
+                     else SampleGroup(entry['groups'][group], load)
+                     for group in SAMPLE_GROUPS)
+
+
+sample_archives = {}
+
+def sample_archive(samples_dir):
+    '''Shared SampleArchive for samples_dir, so its index is read incrementally'''
+    key = str(Path(samples_dir).resolve())
+    if key not in sample_archives:
+        sample_archives[key] = SampleArchive(samples_dir)
+    return sample_archives[key]
+
+
+def file_samples_mtime(samples_dir, place):
+    '''Modification time of the sample store or .npz file for place, or None'''
+    path = samples_path(samples_dir, place)
+    target = path / MANIFEST if path.suffix != '.npz' else path
+    return target.stat().st_mtime if target.exists() else None
+
+
+def archived(samples_dir, place):
+    '''Whether the latest samples for place are in the archive in samples_dir'''
+    archive = sample_archive(samples_dir)
+    if place not in archive:
+        return False
+    mtime = file_samples_mtime(samples_dir, place)
+    return mtime is None or archive.mtime(place) >= mtime
+
+
+def samples_mtime(samples_dir, place):
+    '''Time the latest samples for place were saved, or None'''
+    if archived(samples_dir, place):
+        return sample_archive(samples_dir).mtime(place)
+    return file_samples_mtime(samples_dir, place)
+
+
+def saved_places(samples_dir):
+    '''Places with saved samples in samples_dir (in any format)'''
+    samples_dir = Path(samples_dir)
+    places = set(sample_archive(samples_dir).places())
+    places.update(p.stem for p in samples_dir.glob('*.npz'))
+    places.update(p.parent.name for p in samples_dir.glob(f'*/{MANIFEST}'))
+    return sorted(places)
+
+
+def has_samples(samples_dir, place):
+    return archived(samples_dir, place) or samples_path(samples_dir, place).exists()
+
+
+def load_place_samples(samples_dir, place, mmap_mode='c'):
+    '''Load the latest samples for place from samples_dir
+
+    Uses the archive, a per-place sample store or an older .npz file,
+    whichever was saved last.
+    '''
+    if archived(samples_dir, place):
+        return sample_archive(samples_dir).load(place, mmap_mode)
+    return load_samples(samples_path(samples_dir, place), mmap_mode)
 
 
 def write_summary(filename, mcmc):
@@ -392,7 +1296,27 @@ def write_summary(filename, mcmc):
         filename.chmod(0o664)
 
     
-def load_samples(filename):
+def load_samples(filename, mmap_mode='c'):
+    '''Load samples from a sample store directory or .npz file
+
+    Returns (prior_samples, mcmc_samples, post_pred_samples, forecast_samples).
+    For a sample store, each group is a mapping that loads (and by default
+    memory-maps) fields on first access.
+    '''
+
+    filename = Path(filename)
+
+    # Callers may still ask for <place>.npz when samples are in a store
+    if filename.suffix == '.npz' and not filename.exists():
+        filename = filename.with_suffix('')
+
+    if filename.suffix != '.npz':
+        with open(filename / MANIFEST) as f:
+            manifest = json.load(f)
+        load = lambda entry: onp.load(filename / entry['file'], mmap_mode=mmap_mode)
+        return tuple(None if manifest['groups'].get(group) is None
+                     else SampleGroup(manifest['groups'][group], load)
+                     for group in SAMPLE_GROUPS)
 
     x = np.load(filename, allow_pickle=True)
     
@@ -404,6 +1328,157 @@ def load_samples(filename):
     return prior_samples, mcmc_samples, post_pred_samples, forecast_samples
 
 
+'''Forecast summaries
+
+After a fit, run_place writes summary/<place>_forecast.npz with weekly
+quantiles of each hub target, for submission files, and daily medians and
+prediction intervals, for plots. Submission files and vis use the summary
+instead of loading the samples, unless the samples were saved later.
+'''
+
+HUB_QUANTILES = [0.01, 0.025, 0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.35, 0.4, 0.45, 0.5,
+                 0.55, 0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95, 0.975, 0.99]
+
+# Forecast variable for each hub target
+TARGET_FIELDS = {'inc case' : 'dy',
+                 'cum case' : 'y',
+                 'inc death' : 'dz',
+                 'cum death' : 'z'}
+
+# JHU truth variable for each hub target
+TARGET_OBS = {'inc case' : 'confirmed',
+              'cum case' : 'confirmed',
+              'inc death' : 'death',
+              'cum death' : 'death'}
+
+PLOT_VARIABLES = ['y', 'z', 'dy', 'dz']
+
+
+def forecast_summary_path(prefix, place):
+    return Path(prefix) / 'summary' / f'{place}_forecast.npz'
+
+
+def weekly_sample_quantiles(weekly_df, quantiles):
+    '''Quantiles of weekly samples: one row per week, one column per quantile'''
+    values = onp.percentile(weekly_df.values, onp.array(quantiles)*100, axis=1)
+    return pd.DataFrame(values.T, index=weekly_df.index, columns=quantiles)
+
+
+def forecast_summary(model,
+                     start,
+                     mcmc_samples,
+                     post_pred_samples,
+                     forecast_samples,
+                     quantiles=HUB_QUANTILES):
+    '''Summarize forecast samples: weekly target quantiles and daily bands
+
+    The forecast date is the last date of the fitted data. Incident targets
+    for Sunday forecasts are summarized for both pad strategies (see
+    construct_daily_df); for pad_strategy='truth', the quantiles exclude the
+    Sunday truth value, which is added when reading them.
+    '''
+
+    T = model.horizon(post_pred_samples)
+    forecast_date = pd.to_datetime(start) + pd.Timedelta(T-1, "d")
+
+    weekly = {}
+    for target, field in TARGET_FIELDS.items():
+        samples = onp.asarray(model.get(forecast_samples, field, forecast=True))
+        weekly[target] = {}
+        pads = {'shift': None}
+        if target.startswith('inc') and forecast_date.dayofweek == 6:
+            pads['truth'] = pd.Series(0., index=[forecast_date - pd.Timedelta("1d"), forecast_date])
+        for pad_strategy, truth_data in pads.items():
+            daily_df = construct_daily_df(forecast_date, samples, target, truth_data=truth_data, pad_strategy=pad_strategy)
+            weekly_df = resample_to_weekly(daily_df, target)
+            weekly[target][pad_strategy] = {'weeks': onp.array(weekly_df.index.strftime('%Y-%m-%d'), dtype=str),
+                                            'values': weekly_sample_quantiles(weekly_df, quantiles).values}
+
+    daily = {variable: model.forecast_bands(variable, post_pred_samples, forecast_samples) 
+             for variable in PLOT_VARIABLES}
+
+    return {'forecast_date': forecast_date.strftime('%Y-%m-%d'),
+            'start': pd.to_datetime(start).strftime('%Y-%m-%d'),
+            'quantiles': onp.array(quantiles),
+            'weekly': weekly,
+            'daily': daily,
+            'growth_rate': growth_rate_bands(mcmc_samples)}
+
+
+def save_forecast_summary(filename, summary):
+    '''Save nested dict of arrays as a flat .npz file (keys joined by '/')'''
+
+    def flatten(d, prefix=''):
+        for k, v in d.items():
+            if isinstance(v, dict):
+                yield from flatten(v, f'{prefix}{k}/')
+            else:
+                yield f'{prefix}{k}', onp.asarray(v)
+
+    filename = Path(filename)
+    file_exists = filename.exists()
+    tmp = filename.with_name(f'.{filename.stem}.{os.getpid()}.npz')
+    onp.savez(tmp, **dict(flatten(summary)))
+    os.replace(tmp, filename)
+    if not file_exists:
+        filename.chmod(0o664)
+
+
+def load_forecast_summary(prefix, place):
+    '''Load forecast summary for place, or None if missing or older than the samples'''
+
+    filename = forecast_summary_path(prefix, place)
+    if not filename.exists():
+        return None
+    mtime = samples_mtime(Path(prefix) / 'samples', place)
+    if mtime is not None and mtime > filename.stat().st_mtime:
+        return None
+
+    summary = {}
+    with onp.load(filename) as x:
+        for key in x.files:
+            *path, name = key.split('/')
+            d = summary
+            for k in path:
+                d = d.setdefault(k, {})
+            value = x[key]
+            d[name] = value.item() if value.ndim == 0 else value
+    return summary
+
+
+def summary_weekly_quantiles(summary, forecast_date, target, quantiles, truth_data=None, pad_strategy="shift"):
+    '''Weekly quantiles of target from a forecast summary
+
+    Same as weekly_sample_quantiles of resample_to_weekly(construct_daily_df(...))
+    for the forecast samples. Returns None if the summary does not have them.
+    '''
+    forecast_date = pd.to_datetime(forecast_date)
+    if pd.to_datetime(summary['forecast_date']) != forecast_date:
+        return None
+
+    pads = summary['weekly'].get(target, {})
+    entry = pads.get(pad_strategy) if 'truth' in pads else pads.get('shift')
+    if entry is None:
+        return None
+
+    stored = summary['quantiles']
+    cols = [onp.flatnonzero(onp.isclose(stored, q)) for q in quantiles]
+    if any(len(c) == 0 for c in cols):
+        return None
+    values = entry['values'][:, [c[0] for c in cols]]
+
+    if 'truth' in pads and pad_strategy == 'truth':
+        if truth_data is None:
+            raise ValueError("Must supply truth_data with pad_strategy='truth'")
+        sunday = forecast_date
+        saturday = sunday - pd.Timedelta("1d")
+        truth_val = onp.maximum(truth_data.loc[sunday] - truth_data.loc[saturday], 0.)
+        values = values.copy()
+        values[0] = onp.maximum(values[0] + truth_val, 0.)
+
+    return pd.DataFrame(values, index=pd.to_datetime(entry['weeks']), columns=quantiles)
+
+
 def gen_forecasts(data, 
                   place, 
                   model_type=mechbayes.models.SEIRD.SEIRD,
@@ -416,7 +1491,7 @@ def gen_forecasts(data,
     
 
     # Deal with paths
-    samples_path = Path(prefix) / 'samples'
+    samples_dir = Path(prefix) / 'samples'
     vis_path = Path(prefix) / 'vis'
     vis_path.mkdir(parents=True, exist_ok=True)
     
@@ -428,8 +1503,13 @@ def gen_forecasts(data,
     T = len(confirmed)
     N = data[place]['pop']
 
-    filename = samples_path / f'{place}.npz'   
-    _, mcmc_samples, post_pred_samples, forecast_samples = load_samples(filename)
+    # Plot from the forecast summary; rebuild it if the samples are newer
+    summary = load_forecast_summary(prefix, place)
+    if summary is None or summary['start'] != pd.to_datetime(start).strftime('%Y-%m-%d'):
+        _, mcmc_samples, post_pred_samples, forecast_samples = load_place_samples(samples_dir, place)
+        summary = forecast_summary(model, start, mcmc_samples, post_pred_samples, forecast_samples)
+        if save:
+            save_forecast_summary(forecast_summary_path(prefix, place), summary)
         
     for daily in [False, True]:
         for scale in ['log', 'lin']:
@@ -446,13 +1526,12 @@ def gen_forecasts(data,
 
                 for variable, obs, ax in zip(variables, observations, axes):
                     model.plot_forecast(variable,
-                                        post_pred_samples,
-                                        forecast_samples,
-                                        start,
+                                        start=start,
                                         T_future=T,
                                         obs=obs,
                                         ax=ax,
-                                        scale=scale)
+                                        scale=scale,
+                                        bands=summary['daily'][variable])
 
                 name = data[place]['name']
                 plt.suptitle(f'{name} {T} days ')
@@ -466,7 +1545,7 @@ def gen_forecasts(data,
                     plt.show()
     
     fig, ax = plt.subplots(figsize=(5,4))
-    plot_growth_rate(mcmc_samples, start, ax=ax)
+    plot_growth_rate(None, start, ax=ax, bands=summary['growth_rate'])
     plt.title(place)
     plt.tight_layout()
     
@@ -488,14 +1567,15 @@ Performance metrics
 ************************************************************
 """
 
-def construct_daily_df(forecast_date, forecast_samples, target, truth_data=None, pad_strategy="shift"):
+def daily_forecast(forecast_date, forecast_samples, target, truth_data=None, pad_strategy="shift"):
+    '''Dates and daily forecast samples (samples x days) for target (see construct_daily_df)'''
 
-    # Construct df indexed by time with samples in columns
-    #    - starts one day after forecast date (usually Monday)
-    t = pd.date_range(start=forecast_date + pd.Timedelta("1d"),
-                      periods=forecast_samples.shape[1],
-                      freq='D')
-    daily_df = pd.DataFrame(index=t, data=np.transpose(forecast_samples))
+    forecast_samples = onp.asarray(forecast_samples)
+
+    # Starts one day after forecast date (usually Monday)
+    dates = pd.date_range(start=forecast_date + pd.Timedelta("1d"),
+                          periods=forecast_samples.shape[1],
+                          freq='D')
     
     # For incident forecasts made on Sunday, pad to include a value for Sunday
     # so the first week is complete. This does not apply to forecasts made on 
@@ -508,44 +1588,56 @@ def construct_daily_df(forecast_date, forecast_samples, target, truth_data=None,
     #
     if target.startswith("inc") and forecast_date.dayofweek == 6:
         if pad_strategy == "shift":
-            daily_df.index -= pd.Timedelta("1d")
+            dates -= pd.Timedelta("1d")
         elif pad_strategy == "truth":
             if truth_data is None:
                 raise ValueError("Must supply truth_data with pad_strategy='truth'")
             sunday = forecast_date
             saturday = sunday - pd.Timedelta("1d")
-            truth_val = np.maximum(truth_data.loc[sunday] - truth_data.loc[saturday], 0.)
-            new_row = pd.DataFrame([], index=[sunday])
-            daily_df = pd.concat([new_row, daily_df], ignore_index=False)
-            daily_df.loc[sunday, :] = truth_val
+            truth_val = onp.maximum(truth_data.loc[sunday] - truth_data.loc[saturday], 0.)
+            dates = dates.insert(0, sunday)
+            pad = onp.full((forecast_samples.shape[0], 1), truth_val, dtype=float)
+            forecast_samples = onp.concatenate([pad, forecast_samples], axis=1)
         else:
             raise ValueError(f"Unsuported pad_strategy {pad_strategy}")
 
     # Always starts on forecast date
-    return daily_df
- 
+    return dates, forecast_samples
+
+
+def construct_daily_df(forecast_date, forecast_samples, target, truth_data=None, pad_strategy="shift"):
+
+    # Construct df indexed by time with samples in columns
+    dates, forecast_samples = daily_forecast(forecast_date, forecast_samples, target, truth_data, pad_strategy)
+    return pd.DataFrame(index=dates, data=onp.transpose(forecast_samples))
+
+
+def truncate_to_full_weeks(daily_df, target):
+    '''Truncate to full weeks: incident targets start on Sunday, and all end on Saturday'''
+
+    start = daily_df.index[0]
+    end = daily_df.index[-1]
+    final_saturday = end if end.dayofweek==5 else end - pd.offsets.Week(weekday=5)
+
+    if target.startswith("inc"):        
+        first_sunday = start if start.dayofweek==6 else start + pd.offsets.Week(weekday=6)        
+        return daily_df.loc[first_sunday:final_saturday]
+    else:
+        return daily_df.loc[:final_saturday]
+
+
 def resample_to_weekly(daily_df, target, full_weeks=True, label="left"):
     
     if target.startswith("inc"):        
         if full_weeks:
-            # truncate to start on Sunday and end on Saturday before aggregating
-            start = daily_df.index[0]
-            end = daily_df.index[-1]
-            first_sunday = start if start.dayofweek==6 else start + pd.offsets.Week(weekday=6)        
-            final_saturday = end if end.dayofweek==5 else end - pd.offsets.Week(weekday=5)
-
-            daily_df = daily_df.loc[first_sunday:final_saturday]
+            daily_df = truncate_to_full_weeks(daily_df, target)
 
         weekly_df = daily_df.resample("1w", closed='left', label=label).sum()
 
     elif target.startswith("cum"):
 
         if full_weeks:
-            # truncate end on Saturday before aggregating
-            end = daily_df.index[-1]
-            final_saturday = end if end.dayofweek==5 else end - pd.offsets.Week(weekday=5)
-
-            daily_df = daily_df.loc[:final_saturday]
+            daily_df = truncate_to_full_weeks(daily_df, target)
 
         weekly_df = daily_df.resample("1w", closed='left', label=label).last()
     else:
@@ -555,38 +1647,54 @@ def resample_to_weekly(daily_df, target, full_weeks=True, label="left"):
     return weekly_df 
 
 
-def score_place(forecast_date,
-                data,
-                place,
-                model_type=mechbayes.models.SEIRD.SEIRD,
-                prefix="results",
-                target="cum death",
-                freq="week",
-                periods=None,
-                pad_strategy="shift"):
+def weekly_bins(dates, target, label="left"):
+    '''Weeks of resample_to_weekly for daily dates: labels, and positions of first and last day'''
+    pos = truncate_to_full_weeks(pd.Series(onp.arange(len(dates)), index=dates), target)
+    weeks = pos.resample("1w", closed='left', label=label)
+    first, last = weeks.min(), weeks.max()
+    return first.index, first.values.astype(int), last.values.astype(int)
 
-    '''Gives performance metrics for each time horizon for one place'''
-    
-    if target == 'cum death':
-        forecast_field = 'z'
-        obs_field = 'death'
-    elif target == 'inc death':
-        forecast_field = 'dz'
-        obs_field = 'death'
-    elif target == 'cum case':
-        forecast_field = 'y'
-        obs_field = 'confirmed'
-    elif target == 'inc case':
-        forecast_field = 'dy'
-        obs_field = 'confirmed'
+
+def aggregate_weekly(x, target, first, last):
+    '''Aggregate daily values x (..., days) to weeks given by weekly_bins, like resample_to_weekly'''
+
+    x = onp.asarray(x, dtype=float)
+    if len(first) == 0:
+        return onp.zeros(x.shape[:-1] + (0,))
+
+    if target.startswith("inc"):
+        # Sum, skipping missing values
+        weekly = onp.add.reduceat(onp.nan_to_num(x[..., :last[-1]+1], nan=0.), first, axis=-1)
+    elif target.startswith("cum"):
+        # Last non-missing value in each week
+        days = onp.arange(x.shape[-1])
+        latest = onp.maximum.accumulate(onp.where(onp.isnan(x), -1, days), axis=-1)[..., last]
+        weekly = onp.take_along_axis(x, onp.maximum(latest, 0), axis=-1)
+        weekly[latest < first] = onp.nan
     else:
-        raise ValueError(f"Invalid or unsupported target {target}")
+        raise ValueError(f"uncrecognized target {target}")          
 
-    filename = Path(prefix) / 'samples' / f'{place}.npz'
-    prior_samples, mcmc_samples, post_pred_samples, forecast_samples = \
-        load_samples(filename)
+    weekly[weekly < 0.] = 0.
+    return weekly
 
-    model = model_type()
+
+def forecast_arrays(forecast_date,
+                    data,
+                    place,
+                    model,
+                    forecast_samples,
+                    target="cum death",
+                    freq="week",
+                    periods=None,
+                    pad_strategy="shift"):
+
+    '''Forecast samples (horizons x samples) and observations for scoring one place and target'''
+
+    if target not in TARGET_FIELDS:
+        raise ValueError(f"Invalid or unsupported target {target}")
+
+    forecast_field = TARGET_FIELDS[target]
+    obs_field = TARGET_OBS[target]
 
     forecast_date = pd.to_datetime(forecast_date)
 
@@ -601,78 +1709,193 @@ def score_place(forecast_date,
         start = forecast_date
         obs = data[place]['data'][obs_field].diff()[start:] # incident 
 
-    elif target.startswitch('inc'):
+    elif target.startswith('inc'):
         start = forecast_date + pd.Timedelta("1d")
         obs = data[place]['data'][obs_field].diff()[start:] # incident 
     
     else:
-        raise ValueErorr(f"bad target {target}")
+        raise ValueError(f"bad target {target}")
 
     # Get daily predictions
     forecast_samples = model.get(forecast_samples, forecast_field, forecast=True)
-
-    # Construct data frame for predictions
-    samples = construct_daily_df(pd.to_datetime(forecast_date),
-                                 forecast_samples, 
-                                 target, 
-                                 truth_data=data[place]['data'][obs_field], 
-                                 pad_strategy=pad_strategy)
+    dates, samples = daily_forecast(forecast_date,
+                                    forecast_samples,
+                                    target,
+                                    truth_data=data[place]['data'][obs_field],
+                                    pad_strategy=pad_strategy)
 
     # Truncate observed values and predictions to smaller length
-    T = min(len(obs), samples.shape[0])
-    samples = samples.iloc[:T]
+    T = min(len(obs), len(dates))
+    dates = dates[:T]
+    samples = samples[:, :T]
     obs = obs.iloc[:T]
+    assert obs.index.equals(dates)
 
-    # If weekly, aggregate data frames
+    # If weekly, aggregate
     if freq == "week":
-        samples = resample_to_weekly(samples, target, label="right")
-        obs = resample_to_weekly(obs, target, label="right")
+        target_date, first, last = weekly_bins(dates, target, label="right")
+        samples = aggregate_weekly(samples, target, first, last)
+        obs = aggregate_weekly(obs.values, target, first, last)
         time_unit = pd.Timedelta("1w")
 
-        # observations are aligned to start of next week (Sunday) with pandas, so
+        # weeks are labeled with the start of next week (Sunday) by pandas, so
         # subtract one day to get the target_end_date of Saturday
-        target_end_date = obs.index - pd.Timedelta("1d")
+        target_end_date = target_date - pd.Timedelta("1d")
 
     elif freq == "day":
         time_unit = pd.Timedelta("1d")
-        target_end_date = obs.index
+        target_date = dates
+        target_end_date = dates
+        obs = onp.asarray(obs.values, dtype=float)
     else:
         raise ValueError(f"unreognized value for freq: {freq}")
 
-    assert obs.index.equals(samples.index)
-    target_date = obs.index
     horizon = (target_date - forecast_date)/time_unit    
 
     # only score the requested periods
-    if periods is not None:
-        obs = obs.loc[horizon <= periods]
-        samples = samples.loc[horizon <= periods]
-        target_end_date = target_end_date[horizon <= periods]
-
-
-    # Compute metrics
-    point_forecast = samples.median(axis=1)
-    err = obs - point_forecast
-    n_samples = samples.shape[1]
-    within_100 = samples.sub(obs, axis=0).abs().lt(100)
-    prob = (within_100.sum(axis=1)/n_samples)
-    log_score = prob.apply(np.log).clip(lower=-10).rename('log score')
-    quantile = samples.lt(obs, axis=0).sum(axis=1) / n_samples
-
-    # Construct output data frame
-    scores = pd.DataFrame( {'target' : target,
-                            'forecast_date': forecast_date,
-                            'target_end_date': target_end_date,
-                            'time_unit' : freq,
-                            'horizon' : horizon,
-                            'place' : place,
-                            'err' : pd.Series(obs - point_forecast, dtype='float'),
-                            'log_score' : pd.Series(log_score, dtype='float'),
-                            'quantile' : pd.Series(quantile, dtype='float')},
-                            index=obs.index)
+    keep = onp.ones(len(horizon), dtype=bool) if periods is None else onp.asarray(horizon <= periods)
+
+    return {'target_date': target_date[keep],
+            'target_end_date': target_end_date[keep],
+            'horizon': onp.asarray(horizon)[keep],
+            'samples': samples.T[keep],
+            'obs': obs[keep]}
+
+
+def crps_samples(samples, obs):
+    '''CRPS of obs for samples (..., samples), estimated from sorted samples
+
+    CRPS = E|X - y| - E|X - X'|/2, where E|X - X'| = 2/n^2 sum_i (2i - n - 1) x_(i)
+    for sorted samples x_(1), ..., x_(n), which takes O(n log n) time.
+    '''
+    n = samples.shape[-1]
+    x = onp.sort(samples, axis=-1)
+    weights = 2*onp.arange(1, n+1) - n - 1
+    spread = 2 * (x @ weights) / n**2
+    return onp.abs(samples - obs[..., None]).mean(axis=-1) - spread/2
+
+
+def wis_quantiles(predictions, obs, quantiles):
+    '''Weighted interval score of obs for predictions (quantiles, ...) at quantile levels
+
+    For a symmetric set of quantile levels that includes the median (K
+    central intervals), WIS = 1/(K + 1/2) * sum of quantile (pinball) losses.
+    '''
+    tau = onp.reshape(quantiles, (-1,) + (1,)*obs.ndim)
+    diff = obs - predictions
+    pinball = onp.maximum(tau*diff, (tau - 1)*diff)
+    return 2 * pinball.sum(axis=0) / len(quantiles)
+
+
+def score_arrays(samples, obs, quantiles=HUB_QUANTILES):
+    '''Scores of obs for samples (..., horizons, samples)
+
+    Returns error of median, log score, quantile of obs, CRPS, and WIS of the
+    sample quantiles at the given levels (as in submission files).
+    '''
+
+    n_samples = samples.shape[-1]
+    with warnings.catch_warnings(), onp.errstate(all='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)
+        point_forecast = onp.nanmedian(samples, axis=-1)
+        prob = (onp.abs(samples - obs[..., None]) < 100).sum(axis=-1) / n_samples
+        log_score = onp.maximum(onp.log(prob), -10)
+    quantile = (samples < obs[..., None]).sum(axis=-1) / n_samples
+    crps = crps_samples(samples, obs)
+    wis = wis_quantiles(onp.percentile(samples, onp.array(quantiles)*100, axis=-1), obs, quantiles)
+    return obs - point_forecast, log_score, quantile, crps, wis
+
+
+def scores_frame(forecast_date, freq, rows):
+    '''Scores table from a list of (target, place, forecast_arrays, score_arrays) rows'''
+
+    if not rows:
+        return pd.DataFrame()
+
+    targets, places, arrays, metrics = zip(*rows)
+    lengths = [len(a['horizon']) for a in arrays]
+    err, log_score, quantile, crps, wis = (onp.concatenate(m) for m in zip(*metrics))
+
+    return pd.DataFrame({'target' : onp.repeat(targets, lengths),
+                         'forecast_date': pd.to_datetime(forecast_date),
+                         'target_end_date': arrays[0]['target_end_date'].append([a['target_end_date'] for a in arrays[1:]]),
+                         'time_unit' : freq,
+                         'horizon' : onp.concatenate([a['horizon'] for a in arrays]),
+                         'place' : onp.repeat(places, lengths),
+                         'err' : err.astype(float),
+                         'log_score' : log_score.astype(float),
+                         'quantile' : quantile.astype(float),
+                         'crps' : crps.astype(float),
+                         'wis' : wis.astype(float)},
+                        index=arrays[0]['target_date'].append([a['target_date'] for a in arrays[1:]]))
+
+
+def score_stacked(arrays, quantiles=HUB_QUANTILES):
+    '''Score a dict of place -> forecast_arrays, stacking places with the same shape'''
+
+    groups = {}
+    for place, a in arrays.items():
+        groups.setdefault(a['samples'].shape, []).append(place)
+
+    metrics = {}
+    for places in groups.values():
+        samples = onp.stack([arrays[p]['samples'] for p in places])   # places x horizons x samples
+        obs = onp.stack([arrays[p]['obs'] for p in places])
+        for i, m in enumerate(zip(*score_arrays(samples, obs, quantiles))):
+            metrics[places[i]] = m
+    return metrics
+
+
+def score_place(forecast_date,
+                data,
+                place,
+                model_type=mechbayes.models.SEIRD.SEIRD,
+                prefix="results",
+                target="cum death",
+                freq="week",
+                periods=None,
+                pad_strategy="shift"):
+
+    '''Gives performance metrics for each time horizon for one place'''
+
+    return score_place_targets(forecast_date,
+                               data,
+                               place,
+                               model_type(),
+                               prefix=prefix,
+                               targets=[target],
+                               freq=freq,
+                               periods=periods,
+                               pad_strategy=pad_strategy)[target]
+
+
+def score_place_targets(forecast_date,
+                        data,
+                        place,
+                        model,
+                        prefix="results",
+                        targets=["inc death"],
+                        freq="week",
+                        periods=None,
+                        pad_strategy="shift",
+                        quantiles=HUB_QUANTILES):
+
+    '''Scores for several targets for one place, loading its samples once
+
+    Returns a dict mapping target to scores.
+    '''
 
+    prior_samples, mcmc_samples, post_pred_samples, forecast_samples = \
+        load_place_samples(Path(prefix) / 'samples', place)
+
+    scores = {}
+    for target in targets:
+        a = forecast_arrays(forecast_date, data, place, model, forecast_samples,
+                            target=target, freq=freq, periods=periods, pad_strategy=pad_strategy)
+        scores[target] = scores_frame(forecast_date, freq, [(target, place, a, score_arrays(a['samples'], a['obs'], quantiles))])
     return scores
 
+
 def score_forecast(forecast_date,
                    data, 
                    places=None, 
@@ -683,33 +1906,65 @@ def score_forecast(forecast_date,
                    periods=None,
                    pad_strategy="shift"):
     
+    return score_forecast_targets(forecast_date,
+                                  data,
+                                  places=places,
+                                  model_type=model_type,
+                                  prefix=prefix,
+                                  targets=[target],
+                                  freq=freq,
+                                  periods=periods,
+                                  pad_strategy=pad_strategy)
+
+
+def score_forecast_targets(forecast_date,
+                           data,
+                           places=None,
+                           model_type=mechbayes.models.SEIRD.SEIRD,
+                           prefix="results",
+                           targets=["inc death"],
+                           freq="week",
+                           periods=None,
+                           pad_strategy="shift",
+                           quantiles=HUB_QUANTILES):
+
+    '''Scores for all places and targets in one frame (ordered by target, then place)
+
+    The samples of each place are loaded once for all targets.
+    '''
+
     if places is None:
         places = list(data.keys())
 
-    # Assemble performance metrics each place and time horizon
-    scores = pd.DataFrame()
-    
-    print(f'Scoring {target} for all places for {forecast_date} forecast')
-    
+    model = model_type()
+
+    print(f'Scoring {", ".join(targets)} for all places for {forecast_date} forecast')
+
+    # Load samples of each place once
+    samples = {}
     for place in tqdm(places):
-        
         try:
-            place_df = score_place(forecast_date,
-                                   data,
-                                   place,
-                                   model_type=model_type,
-                                   prefix=prefix,
-                                   target=target,
-                                   freq=freq,
-                                   periods=periods,
-                                   pad_strategy=pad_strategy)
+            samples[place] = load_place_samples(Path(prefix) / 'samples', place)[3]
         except Exception as e:
             warnings.warn(f'Could not score {place}: {e}')
             traceback.print_exc()
-        else:
-            scores = scores.append(place_df)
 
-    return scores
+    # Score each target for all places at once
+    rows = []
+    for target in targets:
+        arrays = {}
+        for place, forecast_samples in samples.items():
+            try:
+                arrays[place] = forecast_arrays(forecast_date, data, place, model, forecast_samples,
+                                                target=target, freq=freq, periods=periods, pad_strategy=pad_strategy)
+            except Exception as e:
+                warnings.warn(f'Could not score {place}: {e}')
+                traceback.print_exc()
+
+        metrics = score_stacked(arrays, quantiles)
+        rows.extend((target, place, arrays[place], metrics[place]) for place in arrays)
+
+    return scores_frame(forecast_date, freq, rows)
 
 def aggregate_scores(scores):
 
@@ -723,6 +1978,8 @@ def aggregate_scores(scores):
     #   err
     #   log_score
     #   quantile
+    #   crps
+    #   wis
     #
     # Group by
     #   target
@@ -732,6 +1989,8 @@ def aggregate_scores(scores):
     #   err
     #   log_score
     #   quantile
+    #   crps
+    #   wis (both missing in scores from earlier versions)
 
     # scores = scores.copy(deep=True)
     # scores = scores[['target', 'time_unit', 'horizon', 'err', 'log_score', 'quantile']]    
@@ -746,7 +2005,9 @@ def aggregate_scores(scores):
             'medAE' : s['err'].abs().median(),
             'log_score' : s['log_score'].mean(),
             'KS' : ks,
-            'KS_pval' : pval
+            'KS_pval' : pval,
+            'CRPS' : s['crps'].mean() if 'crps' in s else onp.nan,
+            'WIS' : s['wis'].mean() if 'wis' in s else onp.nan
         })
 
     summary = scores.groupby(['target', 'time_unit', 'horizon']).apply(myagg).reset_index()
@@ -1,5 +1,6 @@
 import os
 import argparse
+import subprocess
 import pandas as pd
 from pathlib import Path
 import time
@@ -8,10 +9,15 @@ import traceback
 
 
 import mechbayes.util as util
+import mechbayes.jhu as jhu
 
 from vis_util import install_vis
 from submit_util import create_submission_file
-from run_util import load_config, get_method, do_publish
+from run_util import load_config, get_method, do_publish, configure_data, input_hash, read_input_hash
+from run_util import data_file, load_places, prepare_cleaned_data, load_truth
+from local_util import run_tasks, write_run_report
+from ledger_util import load_history, estimate_resources, retry_budget, order_tasks, sbatch_resources, worker_resources
+from queue_util import enqueue, queue_status
 
 if __name__ == "__main__":
 
@@ -42,11 +48,22 @@ if __name__ == "__main__":
     other_args.add_argument('--no-submission', help="skip creating submission file", dest='submission', action='store_false')
     other_args.set_defaults(submission=True)
 
+    other_args.add_argument('--data_snapshot', help="name of JHU data snapshot to use (default: today)")
+    other_args.add_argument('--offline', help="only read data from local snapshots", action='store_true')
+
+    other_args.add_argument('--archive', help="append samples for all places to one archive per forecast date", action='store_true')
+    other_args.add_argument('--force', help="run all places, even if their inputs have not changed since the last run", action='store_true')
+
     other_args.add_argument('--sbatch', help="launch jobs with sbatch (default)", dest='sbatch', action='store_true')
     other_args.add_argument('--no-sbatch', help="run jobs locally", dest='sbatch', action='store_false')
     other_args.set_defaults(sbatch=True)
-    other_args.add_argument('--log_dir', help='log directory for sbatch jobs', default='log')
+    other_args.add_argument('--log_dir', help='log directory for jobs', default='log')
     other_args.add_argument('--sleep', help="seconds to sleep between sbatch calls (default: 0.1)", type=float, default=0.1)
+    other_args.add_argument('--jobs', help="number of jobs to run concurrently with --no-sbatch or per queue worker (default: 1)", type=int, default=1)
+    other_args.add_argument('--threads', help="compute threads per job with --no-sbatch or queue workers (default: cores / jobs)", type=int)
+    other_args.add_argument('--queue_dir', help="write tasks to this work queue directory instead of launching one job per task")
+    other_args.add_argument('--workers', help="number of queue workers to start with --queue_dir (default: 0)", type=int, default=0)
+    other_args.add_argument('--ledger', help="ledger directory of run times used to order jobs and size sbatch requests (default: <log_dir>/ledger)")
 
     '''Get model_configs, region, and start date. 
     
@@ -58,6 +75,7 @@ if __name__ == "__main__":
     region = None
     start = None
     config = load_config(args.config_file)
+    configure_data(config, args.data_snapshot, args.offline)
     
     output_dir = args.output_dir if args.output_dir else config['output_dir']
     if not output_dir:
@@ -106,12 +124,37 @@ if __name__ == "__main__":
         
     # Other arguments
     log_root = args.log_dir
-    extra_args = '' if args.run else '--no-run'
+    ledger = Path(args.ledger or f'{log_root}/ledger').resolve()
+    extra_args = f'--ledger {ledger}' if args.run else '--no-run'
+    if args.archive:
+        extra_args += ' --archive'
+
+    # Fetch data once and have all jobs read the same snapshot without network access
+    if args.mode == "launch" and config.get('data_dir'):
+        extra_args += f' --data_snapshot {jhu.prefetch()} --offline'
+
+    tasks = []
+    truth_data = None
+
+    # Prepare stage: clean data once per forecast date and save it for all place jobs
+    prepare = args.mode == "launch" and args.run
+    if prepare:
+        raw_data = util.load_data()
+        load_places(raw_data, places)
+        cleaned_data = {}
+
+    # For incremental launches, compare inputs against last run
+    check_inputs = prepare and not args.force
 
     for model_config_name in model_config_names:
         for forecast_date in forecast_dates:
             prefix = f'{output_dir}/{forecast_group}/{model_config_name}/{forecast_date}'
 
+            if prepare and forecast_date not in cleaned_data:
+                print(f"Preparing data for {forecast_date}")
+                filename = data_file(output_dir, forecast_group, f'cleaned_{forecast_date}')
+                cleaned_data[forecast_date] = prepare_cleaned_data(raw_data, places, forecast_date, filename)
+
             if args.mode == "test":
                 for place in places:
                     name = f'{place}-{forecast_date}-{model_config_name}'
@@ -121,31 +164,26 @@ if __name__ == "__main__":
                 for place in places:
 
                     name = f'{place}-{forecast_date}-{model_config_name}'
+
+                    if check_inputs and place in cleaned_data[forecast_date]:
+                        model_config = config['model_configs'][model_config_name]
+                        h = input_hash(cleaned_data[forecast_date], place, start, forecast_date, model_config, config.get('fit_checks'))
+                        if h == read_input_hash(prefix, place) and util.has_samples(f'{prefix}/samples', place):
+                            print(f"Skipping {name} (inputs unchanged)")
+                            continue
+
                     cmd = f'./run_model.sh "{place}" --config_file {args.config_file} --start {start} --end {forecast_date} --model_config {model_config_name} --prefix {prefix} {extra_args}'
-                    if args.sbatch:
-
-                        print(f"Launching {name}")
-
-                        logdir = f'{log_root}/{forecast_group}/{model_config_name}/{forecast_date}'
-                        Path(logdir).mkdir(parents=True, exist_ok=True)
-
-                        sbatch_cmd = f'sbatch ' \
-                            f'--job-name="{name}" ' \
-                            f'--output="{logdir}/{place}.out" ' \
-                            f'--error="{logdir}/{place}.err" ' \
-                            f'--nodes=1 ' \
-                            f'--ntasks=1 ' \
-                            f'--mem=1000 ' \
-                            f'--time=04:00:00 ' \
-                            f'--partition=defq ' + cmd
-
-                        os.system(sbatch_cmd)
-                        time.sleep(args.sleep)
-
-                    else:
-                        print(f"Running {name}")
-                        os.system(cmd)
-                        
+                    if prepare:
+                        cmd += f" --data_file {data_file(output_dir, forecast_group, f'cleaned_{forecast_date}')}"
+                    logdir = f'{log_root}/{forecast_group}/{model_config_name}/{forecast_date}'
+
+                    tasks.append({'name': name,
+                                  'place': place,
+                                  'model_config': model_config_name,
+                                  'forecast_date': forecast_date,
+                                  'logdir': logdir,
+                                  'cmd': cmd})
+
             elif args.mode == "collect":
                 
                 # Install visualization
@@ -162,7 +200,8 @@ if __name__ == "__main__":
 
                     # JHU data is used to pad incident forecasts with a value for Sunday
                     # of the forecast week
-                    data = util.load_data()
+                    if truth_data is None:
+                        truth_data = load_truth(output_dir, forecast_group, places)
 
                     # Get dummy model instance: used to extract forecast from samples
                     model_config = config['model_configs'][model_config_name]
@@ -173,7 +212,7 @@ if __name__ == "__main__":
                         create_submission_file(prefix,
                                                forecast_date,
                                                model,
-                                               data,
+                                               truth_data,
                                                places,
                                                forecast_config['submission_args'])
                     except Exception:
@@ -187,3 +226,88 @@ if __name__ == "__main__":
 
             else:
                 raise ValueError(f"Invalid mode: {args.mode}")
+
+    if args.mode == "launch":
+
+        # Start long-running jobs first, based on the ledger of previous runs. Time
+        # requests allow for all retries of fits that fail their checks
+        estimates = estimate_resources(load_history(ledger), time_factor=retry_budget(config.get('fit_checks')))
+        tasks = order_tasks(tasks, estimates)
+
+        if args.queue_dir:
+
+            # Queue mode: workers on any node pull tasks until the queue is empty
+            enqueue(args.queue_dir, tasks)
+            print(f"Added {len(tasks)} tasks to queue {args.queue_dir}")
+
+            worker_cmd = f'./worker.sh --queue_dir {args.queue_dir} --jobs {args.jobs}'
+            if args.threads:
+                worker_cmd += f' --threads {args.threads}'
+
+            if not tasks or args.workers <= 0:
+                # Workers can be attached to the queue later
+                print(f"No workers started; run {worker_cmd} to work on the queue")
+
+            elif args.sbatch:
+                logdir = f'{log_root}/{forecast_group}/workers'
+                Path(logdir).mkdir(parents=True, exist_ok=True)
+
+                time_limit, mem = worker_resources(tasks, estimates, workers=args.workers, jobs=args.jobs)
+
+                for i in range(args.workers):
+                    print(f"Launching worker {i}")
+                    sbatch_cmd = f'sbatch ' \
+                        f'--job-name="worker-{i}" ' \
+                        f'--output="{logdir}/worker-{i}.out" ' \
+                        f'--error="{logdir}/worker-{i}.err" ' \
+                        f'--nodes=1 ' \
+                        f'--ntasks=1 ' \
+                        f'--cpus-per-task={args.jobs * (args.threads or 1)} ' \
+                        f'--mem={mem} ' \
+                        f'--time={time_limit} ' \
+                        f'--partition=defq ' + worker_cmd
+
+                    os.system(sbatch_cmd)
+                    time.sleep(args.sleep)
+
+            else:
+                print(f"Starting {args.workers} local workers")
+                workers = [subprocess.Popen(worker_cmd, shell=True) for i in range(args.workers)]
+                for worker in workers:
+                    worker.wait()
+                print(f"Queue status: {queue_status(args.queue_dir)}")
+
+        elif args.sbatch:
+            for task in tasks:
+
+                name = task['name']
+                place = task['place']
+                logdir = task['logdir']
+
+                print(f"Launching {name}")
+
+                Path(logdir).mkdir(parents=True, exist_ok=True)
+
+                time_limit, mem = sbatch_resources(estimates.get((place, task['model_config'])))
+
+                sbatch_cmd = f'sbatch ' \
+                    f'--job-name="{name}" ' \
+                    f'--output="{logdir}/{place}.out" ' \
+                    f'--error="{logdir}/{place}.err" ' \
+                    f'--nodes=1 ' \
+                    f'--ntasks=1 ' \
+                    f'--mem={mem} ' \
+                    f'--time={time_limit} ' \
+                    f'--partition=defq ' + task['cmd']
+
+                # Record the request in the ledger so it can be raised if the run is killed
+                if args.run:
+                    sbatch_cmd += f' --time_limit {time_limit} --mem {mem}'
+
+                os.system(sbatch_cmd)
+                time.sleep(args.sleep)
+
+        else:
+            results = run_tasks(tasks, jobs=args.jobs, threads=args.threads)
+            timestamp = pd.Timestamp.now().strftime('%Y-%m-%d_%H%M%S')
+            write_run_report(results, f'{log_root}/{forecast_group}/run_report_{timestamp}.csv')
@@ -0,0 +1,210 @@
+import os
+import json
+import socket
+import warnings
+import pandas as pd
+from pathlib import Path
+
+'''Ledger of wall time, peak memory and exit status of model runs
+
+The ledger is a directory with one json record per run of run_model.py,
+so that jobs on many nodes never write the same file (the ledger is often
+on NFS, where file locking is unreliable). A record is written when a run
+starts and replaced when it finishes; runs killed by the sbatch time limit
+or the OOM killer keep their start record. launch.py reads all records to
+start long-running jobs first and to size sbatch requests from history.
+'''
+
+COLUMNS = ['place', 'model_config', 'forecast_date', 'started', 'finished',
+           'wall_time',     # seconds
+           'max_rss',       # MB
+           'status',        # exit status (missing if the run never finished)
+           'req_time',      # requested sbatch time limit in seconds (if known)
+           'req_mem']       # requested sbatch memory in MB (if known)
+
+# number of recent successful runs used for estimates
+NUM_RECENT = 5
+
+# safety margin of sbatch requests over estimates
+MARGIN = 1.5
+
+# factor by which requests grow after a run that failed or did not finish
+RETRY_FACTOR = 2
+
+
+def write_record(filename, record):
+    tmp = filename.with_name(f'.{filename.name}.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(record, f)
+    os.replace(tmp, filename)
+
+
+def record_start(ledger, place, model_config, forecast_date, req_time=None, req_mem=None):
+    '''Add a record for a run that is starting. Returns (filename, record), or None if it could not be written'''
+    now = pd.Timestamp.now()
+    record = {'place': place,
+              'model_config': model_config,
+              'forecast_date': forecast_date,
+              'started': now.isoformat(),
+              'req_time': req_time,
+              'req_mem': req_mem}
+    name = f"{place}_{model_config}_{forecast_date}_{socket.gethostname()}_{os.getpid()}_{now.strftime('%Y%m%d%H%M%S')}.json"
+    filename = Path(ledger) / name.replace('/', '_')
+    try:
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        write_record(filename, record)
+    except OSError as e:
+        warnings.warn(f"Could not write to ledger {ledger}: {e}")
+        return None
+    return filename, record
+
+
+def record_finish(started, wall_time, max_rss, status):
+    '''Complete the record of a run (started is the value returned by record_start)'''
+    if started is None:
+        return
+    filename, record = started
+    record = dict(record,
+                  finished=pd.Timestamp.now().isoformat(),
+                  wall_time=wall_time,
+                  max_rss=max_rss,
+                  status=status)
+    try:
+        write_record(filename, record)
+    except OSError as e:
+        warnings.warn(f"Could not write to ledger {filename.parent}: {e}")
+
+
+def load_history(ledger):
+    '''Get all runs in the ledger as a data frame'''
+    records = []
+    for filename in Path(ledger).glob('*.json'):
+        try:
+            with open(filename) as f:
+                records.append(json.load(f))
+        except (OSError, ValueError):
+            continue  # replaced or removed while reading
+    return pd.DataFrame(records).reindex(columns=COLUMNS)
+
+
+def still_running(run, now):
+    '''Check if an unfinished run may still be within its time limit'''
+    return pd.isna(run['status']) and pd.notna(run['req_time']) and \
+        now - pd.Timestamp(run['started']) < pd.Timedelta(seconds=run['req_time'])
+
+
+def raise_estimate(estimate, run):
+    '''Estimate after a run that failed or did not finish (e.g., it was killed at its limits)
+
+    The next request is RETRY_FACTOR times the request of that run or, if
+    it is not known, RETRY_FACTOR times the previous estimate.
+    '''
+    raised = {}
+    for field, requested in [('wall_time', run['req_time']), ('max_rss', run['req_mem'])]:
+        if pd.notna(requested):
+            raised[field] = RETRY_FACTOR * requested / MARGIN
+        elif estimate is not None:
+            raised[field] = RETRY_FACTOR * estimate[field]
+        else:
+            return None
+        if estimate is not None:
+            raised[field] = max(raised[field], estimate[field])
+    return raised
+
+
+def retry_budget(fit_checks):
+    '''Run time of a fit with all retries of fit_checks, relative to one attempt
+
+    Each retry multiplies warmup by warmup_factor (see util.retry_settings);
+    run time is taken to be proportional to warmup, which is an upper bound.
+    '''
+    fit_checks = fit_checks or {}
+    warmup_factor = fit_checks.get('warmup_factor', 2)
+    return sum(warmup_factor**k for k in range(fit_checks.get('max_attempts', 1)))
+
+
+def estimate_resources(history, time_factor=1):
+    '''Estimate wall time and peak memory for each (place, model_config)
+
+    Uses the maximum over the most recent successful runs, so estimates
+    follow growth of the time series but are not thrown off by one fast run.
+    Wall times are multiplied by time_factor (e.g., the retry budget of fit
+    checks). If the latest run failed or never finished, the estimate is
+    raised so the next request is larger than the one that was not enough.
+    '''
+    now = pd.Timestamp.now()
+    history = history.sort_values('started')
+    estimates = {}
+    for key, runs in history.groupby(['place', 'model_config']):
+        runs = runs.loc[[not still_running(run, now) for _, run in runs.iterrows()]]
+        if len(runs) == 0:
+            continue
+
+        ok = runs.loc[runs['status'] == 0].tail(NUM_RECENT)
+        estimate = {'wall_time': time_factor * ok['wall_time'].max(), 'max_rss': ok['max_rss'].max()} if len(ok) else None
+
+        latest = runs.iloc[-1]
+        if latest['status'] != 0:
+            estimate = raise_estimate(estimate, latest)
+
+        if estimate is not None:
+            estimates[key] = estimate
+    return estimates
+
+
+def order_tasks(tasks, estimates):
+    '''Sort tasks longest-first by estimated wall time
+
+    Tasks without history are put first (they may be long), and otherwise
+    keep their original order.
+    '''
+    def expected_time(task):
+        estimate = estimates.get((task['place'], task['model_config']))
+        return float('inf') if estimate is None else estimate['wall_time']
+
+    return sorted(tasks, key=expected_time, reverse=True)
+
+
+def sbatch_resources(estimate,
+                     default_time=4*3600,
+                     default_mem=1000,
+                     margin=MARGIN,
+                     min_time=10*60,
+                     min_mem=500):
+    '''Get --time and --mem values for sbatch from estimate (or defaults)'''
+
+    if estimate is None:
+        seconds, mem = default_time, default_mem
+    else:
+        seconds = max(margin * estimate['wall_time'], min_time)
+        mem = max(margin * estimate['max_rss'], min_mem)
+
+    minutes = int(-(-seconds // 60))
+    time_str = f'{minutes // 60:02d}:{minutes % 60:02d}:00'
+    return time_str, int(mem)
+
+
+def worker_resources(tasks,
+                     estimates,
+                     workers=1,
+                     jobs=1,
+                     default_time=4*3600,
+                     default_mem=1000,
+                     **kwargs):
+    '''Get --time and --mem values for sbatch workers that share a queue of tasks
+
+    Each worker runs jobs tasks at a time, so it needs memory for its jobs
+    largest tasks, and time for its share of the total (but at least the
+    longest task). Without tasks or workers, the defaults are returned.
+    '''
+    if not tasks or workers < 1:
+        return sbatch_resources(None, default_time=default_time, default_mem=default_mem, **kwargs)
+
+    task_estimates = [estimates.get((t['place'], t['model_config'])) for t in tasks]
+    times = [default_time if e is None else e['wall_time'] for e in task_estimates]
+    mems = [default_mem if e is None else e['max_rss'] for e in task_estimates]
+
+    estimate = {'wall_time': max(max(times), sum(times) / (workers * jobs)),
+                'max_rss': sum(sorted(mems)[-jobs:])}
+
+    return sbatch_resources(estimate, **kwargs)
@@ -0,0 +1,141 @@
+import os
+import queue
+import subprocess
+import time
+import pandas as pd
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+'''Utilities for running jobs on the local machine'''
+
+# Environment variables that control the size of BLAS/OpenMP thread pools
+THREAD_VARS = ['OMP_NUM_THREADS',
+               'MKL_NUM_THREADS',
+               'OPENBLAS_NUM_THREADS',
+               'VECLIB_MAXIMUM_THREADS',
+               'NUMEXPR_NUM_THREADS']
+
+
+def default_threads(jobs):
+    '''Split the cores of this machine evenly between concurrent jobs'''
+    return max(1, (os.cpu_count() or 1) // max(1, jobs))
+
+
+def thread_env(threads):
+    '''Get environment for a child process limited to a number of compute threads
+
+    Each job is a separate python process that imports jax, so XLA and BLAS
+    would otherwise each start one thread per core. With many concurrent jobs
+    this oversubscribes the machine. XLA has no flag for the size of its
+    thread pool, so with one thread its multi-threaded Eigen kernels are
+    turned off; otherwise it is limited by pinning the job to its share of
+    cores (see core_slots).
+    '''
+    env = dict(os.environ)
+    for var in THREAD_VARS:
+        env[var] = str(threads)
+
+    if threads == 1:
+        xla_flags = [env.get('XLA_FLAGS', ''), '--xla_cpu_multi_thread_eigen=false']
+        env['XLA_FLAGS'] = ' '.join(f for f in xla_flags if f)
+
+    return env
+
+
+def core_slots(jobs, threads):
+    '''Split the cores available to this process into one set per concurrent job
+
+    XLA sizes its thread pool by the cores a process may run on, so pinning
+    each job to its own threads cores is what limits it. Returns a queue of
+    core sets, or None where affinity is not supported (e.g., macOS). If
+    there are fewer than jobs * threads cores, sets wrap around and overlap.
+    '''
+    if not hasattr(os, 'sched_setaffinity'):
+        return None
+    cores = sorted(os.sched_getaffinity(0))
+    slots = queue.Queue()
+    for i in range(jobs):
+        slots.put({cores[(i * threads + k) % len(cores)] for k in range(threads)})
+    return slots
+
+
+def run_task(task, env=None, log=True, slots=None):
+    '''Run the command for one task and wait for it to finish
+
+    A task is a dict with (at least) the keys 'name', 'place', and 'cmd'.
+    If log is True, stdout and stderr are written to files in task['logdir']
+    with the same names used for sbatch jobs. If slots (see core_slots) is
+    given, the task is pinned to a free set of cores while it runs.
+    '''
+    start = time.time()
+
+    cores = slots.get() if slots is not None else None
+    preexec_fn = (lambda: os.sched_setaffinity(0, cores)) if cores else None
+
+    try:
+        if log:
+            Path(task['logdir']).mkdir(parents=True, exist_ok=True)
+            with open(f"{task['logdir']}/{task['place']}.out", "w") as out, \
+                 open(f"{task['logdir']}/{task['place']}.err", "w") as err:
+                status = subprocess.run(task['cmd'], shell=True, stdout=out, stderr=err, env=env, preexec_fn=preexec_fn).returncode
+        else:
+            status = subprocess.run(task['cmd'], shell=True, env=env, preexec_fn=preexec_fn).returncode
+    finally:
+        if cores is not None:
+            slots.put(cores)
+
+    result = {k: v for k, v in task.items() if k != 'cmd'}
+    result['status'] = status
+    result['wall_time'] = time.time() - start
+    return result
+
+
+def run_tasks(tasks, jobs=1, threads=None):
+    '''Run tasks in a pool of concurrent local processes
+
+    Each task runs as its own child process; at most jobs of them run at
+    once. Returns a list with one result per task in the order tasks finish.
+    '''
+    threads = threads or default_threads(jobs)
+    env = thread_env(threads)
+    slots = core_slots(jobs, threads)
+
+    # With one job at a time, let output go to the terminal as before
+    log = jobs > 1
+
+    print(f"Running {len(tasks)} tasks locally ({jobs} jobs, {threads} threads per job)")
+
+    results = []
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {}
+        for task in tasks:
+            futures[executor.submit(run_task, task, env, log, slots)] = task
+
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # e.g., the log directory could not be written; keep going with the other tasks
+                task = futures[future]
+                result = {k: v for k, v in task.items() if k != 'cmd'}
+                result.update(status=-1, wall_time=float('nan'), error=repr(e))
+            outcome = "done" if result['status'] == 0 else f"FAILED (exit status {result['status']})"
+            print(f"Finished {result['name']}: {outcome} in {result['wall_time']:.0f}s")
+            results.append(result)
+
+    return results
+
+
+def write_run_report(results, filename):
+    '''Summarize exit statuses of local tasks and write report to csv file'''
+
+    report = pd.DataFrame(results)
+    Path(filename).parent.mkdir(parents=True, exist_ok=True)
+    report.to_csv(filename, float_format="%.1f", index=False)
+
+    failed = [r['name'] for r in results if r['status'] != 0]
+    print(f"{len(results) - len(failed)} of {len(results)} tasks succeeded (report: {filename})")
+    for name in failed:
+        print(f"  failed: {name}")
+
+    return report
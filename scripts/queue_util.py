@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import socket
+import threading
+import warnings
+from pathlib import Path
+
+'''Filesystem-backed work queue
+
+A queue is a directory shared by all workers (e.g., on NFS):
+
+    <queue_dir>/pending/<id>.json                       tasks waiting to run
+    <queue_dir>/running/<id>.<worker>.<attempt>.json    claimed tasks; the file mtime is the lease
+    <queue_dir>/done/<id>.json                          finished tasks, with exit status
+    <queue_dir>/failed/<id>.json                        tasks that failed or ran out of attempts
+
+Every state change is a rename within the queue directory, which is atomic,
+so at most one worker can claim (or requeue) each task. A worker holding a
+task touches its file periodically. If the worker dies, the lease expires
+and another worker moves the task back to pending/. Each claim has its own
+lease file, so a worker whose lease expired cannot renew, remove or record
+the result of a later claim of the same task.
+'''
+
+STATES = ['pending', 'running', 'done', 'failed']
+
+LEASE_TIME = 15*60  # seconds
+
+
+def init_queue(queue_dir):
+    for state in STATES:
+        Path(queue_dir, state).mkdir(parents=True, exist_ok=True)
+
+
+def worker_id():
+    return f'{socket.gethostname()}-{os.getpid()}-{threading.get_ident()}'.replace('.', '_')
+
+
+def task_id(filename):
+    '''Id of the task in a pending, running, done or failed file'''
+    return Path(filename).name.split('.')[0]
+
+
+def write_record(filename, record):
+    '''Write task record to a temporary file and atomically move it into place'''
+    tmp = Path(filename).parent / f'.{Path(filename).name}.{worker_id()}'
+    with open(tmp, 'w') as f:
+        json.dump(record, f)
+    os.replace(tmp, filename)
+
+
+def read_record(filename):
+    with open(filename) as f:
+        return json.load(f)
+
+
+def enqueue(queue_dir, tasks):
+    '''Add tasks to the queue. Workers claim tasks in the order given
+
+    Ids start with the time, so tasks of later calls sort after earlier
+    ones, and include the host and process, so concurrent calls do not
+    overwrite each other's tasks.
+    '''
+    init_queue(queue_dir)
+    batch = f"{time.time_ns():020d}-{worker_id().replace('-', '_')}"
+    for i, task in enumerate(tasks):
+        task = dict(task, attempts=0)
+        write_record(Path(queue_dir, 'pending', f'{batch}-{i:06d}.json'), task)
+
+
+def claim(queue_dir):
+    '''Claim the next pending task. Returns (lease file, task) or None if none are left'''
+    for filename in sorted(Path(queue_dir, 'pending').glob('*.json')):
+        try:
+            attempt = read_record(filename)['attempts']
+            lease = Path(queue_dir, 'running', f'{task_id(filename)}.{worker_id()}.{attempt}.json')
+            # renew mtime before the move so the lease is not already expired
+            os.utime(filename)
+            os.rename(filename, lease)
+        except FileNotFoundError:
+            continue  # claimed by another worker
+        return lease, read_record(lease)
+    return None
+
+
+def renew(lease):
+    os.utime(lease)
+
+
+def finish(queue_dir, lease, task, result):
+    '''Move claimed task to done/ or failed/ depending on exit status
+
+    The result is only recorded if the lease is still held; otherwise the
+    task was requeued and its result belongs to the later claim.
+    '''
+    try:
+        # take the lease privately so it cannot be requeued meanwhile
+        mine = lease.parent / f'.{lease.name}.{worker_id()}'
+        os.rename(lease, mine)
+    except FileNotFoundError:
+        warnings.warn(f"Lease for {task['name']} expired while running")
+        return
+
+    state = 'done' if result['status'] == 0 else 'failed'
+    write_record(Path(queue_dir, state, f'{task_id(lease)}.json'), dict(task, **result))
+    os.remove(mine)
+
+
+def requeue_expired(queue_dir, lease_time=LEASE_TIME, max_attempts=3):
+    '''Move tasks whose lease has expired back to pending/ (or to failed/)'''
+    now = time.time()
+    for lease in Path(queue_dir, 'running').glob('*.json'):
+        try:
+            if now - lease.stat().st_mtime < lease_time:
+                continue
+            # take the task privately before changing it
+            mine = lease.parent / f'.{lease.name}.{worker_id()}'
+            os.rename(lease, mine)
+        except FileNotFoundError:
+            continue
+
+        task = read_record(mine)
+        task['attempts'] += 1
+        state = 'pending' if task['attempts'] < max_attempts else 'failed'
+        print(f"Lease expired for {task['name']} (attempt {task['attempts']}): moving to {state}")
+        write_record(Path(queue_dir, state, f'{task_id(lease)}.json'), task)
+        os.remove(mine)
+
+
+def queue_status(queue_dir):
+    '''Number of tasks in each state'''
+    return {state: len(list(Path(queue_dir, state).glob('*.json'))) for state in STATES}
+
+
+def work(queue_dir, run, lease_time=LEASE_TIME, max_attempts=3, poll=30):
+    '''Claim and run tasks until the queue is empty
+
+    run is a function that runs one task and returns a result dict with
+    (at least) the key 'status'. The worker waits while other workers have
+    tasks running, so that it can pick up tasks whose lease expires.
+    '''
+    results = []
+    while True:
+        requeue_expired(queue_dir, lease_time, max_attempts)
+
+        claimed = claim(queue_dir)
+        if claimed is None:
+            if queue_status(queue_dir)['running'] == 0:
+                return results
+            time.sleep(poll)
+            continue
+
+        lease, task = claimed
+
+        # Keep lease alive while the task runs
+        stop = threading.Event()
+        def heartbeat():
+            while not stop.wait(lease_time / 4):
+                try:
+                    renew(lease)
+                except FileNotFoundError:
+                    return
+        thread = threading.Thread(target=heartbeat, daemon=True)
+        thread.start()
+
+        try:
+            result = run(task)
+        finally:
+            stop.set()
+            thread.join()
+
+        finish(queue_dir, lease, task, result)
+        results.append(result)
@@ -2,10 +2,14 @@ import numpyro
 numpyro.enable_x64()
 
 import sys
+import time
+import resource
 import argparse
 import mechbayes.util as util
 import numpy as onp
-from run_util import load_config, get_method
+import pandas as pd
+from run_util import load_config, get_method, configure_data, input_hash, write_input_hash, clear_input_hash
+from ledger_util import record_start, record_finish
 import data_cleaning
 
 if __name__ == "__main__":
@@ -23,30 +27,74 @@ if __name__ == "__main__":
     parser.add_argument('--run', help="run model", dest='run', action='store_true')
     parser.add_argument('--no-run', help="update plots without running model", dest='run', action='store_false')
     parser.set_defaults(run=True)
+    parser.add_argument('--ledger', help='record wall time, peak memory and exit status of run in this ledger directory')
+    parser.add_argument('--time_limit', help='sbatch time limit of this run (HH:MM:SS), recorded in the ledger')
+    parser.add_argument('--mem', help='sbatch memory request of this run in MB, recorded in the ledger', type=int)
+    parser.add_argument('--data_snapshot', help='name of JHU data snapshot to use (default: today)')
+    parser.add_argument('--offline', help='only read data from local snapshots', action='store_true')
+    parser.add_argument('--archive', help='append samples to the archive for the forecast date instead of a per-place store', action='store_true')
+    parser.add_argument('--data_file', help='cleaned data prepared by launch.py (path without extension)')
 
     args = parser.parse_args()
 
     config = load_config(args.config_file)
+    configure_data(config, args.data_snapshot, args.offline)
     model_config = config['model_configs'][args.model_config]
     model_type = get_method(model_config['model'])
     forecast_date = args.end
 
-    data = util.load_data()
-    clean_to_date = forecast_date if args.run else data['US']['data'].index[-1]
-    data_cleaning.clean(data, clean_to_date)
-
-    if args.run:
-        util.run_place(data,
-                       args.place,
-                       start=args.start,
-                       end=forecast_date,
-                       prefix=args.prefix,
-                       model_type=model_type,
-                       **model_config['args'])
-    
-    util.gen_forecasts(data,
-                       args.place,
-                       start=args.start,
-                       prefix=args.prefix,
-                       model_type=model_type,
-                       show=False)
+    start_time = time.time()
+    status = 1
+
+    # Record the start, so runs killed at their time or memory limit are in the ledger
+    started = None
+    if args.run and args.ledger:
+        req_time = pd.Timedelta(args.time_limit).total_seconds() if args.time_limit else None
+        started = record_start(args.ledger, args.place, args.model_config, forecast_date, req_time, args.mem)
+
+    try:
+        if args.data_file:
+            # Already cleaned up to the forecast date
+            data = util.Panel.load(args.data_file)
+        else:
+            data = util.load_data()
+            clean_to_date = forecast_date if args.run else data['US']['data'].index[-1]
+            data_cleaning.clean(data, clean_to_date, places=[args.place])
+
+        if args.run:
+            # Don't skip this place in later launches until the run succeeds
+            clear_input_hash(args.prefix, args.place)
+
+            failures = util.run_place(data,
+                                     args.place,
+                                     start=args.start,
+                                     end=forecast_date,
+                                     prefix=args.prefix,
+                                     model_type=model_type,
+                                     fit_checks=config.get('fit_checks'),
+                                     archive=args.archive,
+                                     **model_config['args'])
+
+        util.gen_forecasts(data,
+                           args.place,
+                           start=args.start,
+                           prefix=args.prefix,
+                           model_type=model_type,
+                           show=False)
+
+        # Record inputs so launch.py can skip this place if they don't change,
+        # once forecasts are written and the fit passed its checks
+        if args.run and not failures:
+            write_input_hash(args.prefix,
+                             args.place,
+                             input_hash(data, args.place, args.start, forecast_date, model_config, config.get('fit_checks')))
+
+        status = 0
+
+    finally:
+        if started:
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB -> MB
+            record_finish(started,
+                          time.time() - start_time,
+                          max_rss,
+                          status)
@@ -1,7 +1,16 @@
 import importlib
+import inspect
+import hashlib
 import json
 import traceback
 import os
+import pandas as pd
+from pathlib import Path
+
+import mechbayes
+import mechbayes.jhu as jhu
+import mechbayes.util as util
+import data_cleaning
 
 '''Utilities for running the model'''
 def load_config(filename):
@@ -14,6 +23,14 @@ def load_config(filename):
 
     return config
 
+def configure_data(config, data_snapshot=None, offline=False):
+    '''Use local snapshot store for JHU data if data_dir is set in config'''
+    data_dir = config.get('data_dir')
+    if data_dir:
+        jhu.use_snapshots(data_dir, data_snapshot, offline)
+    elif data_snapshot or offline:
+        raise ValueError("data_dir must be set in config file to use data snapshots")
+
 def get_method(method_name):
     '''Given a string like foo.bar.baz where baz is a method in the
     module foo.bar, imports foo.bar and returns the method foo.bar.baz"
@@ -42,3 +59,95 @@ def do_publish(output_dir, forecast_config, forecast_group, model_config_name=No
     except Exception:
         warnings.warn("Failed to publish to web server. Exception info:")
         traceback.print_exc()
+
+
+def input_hash(data, place, start, end, model_config, fit_checks=None):
+    '''Content hash of the inputs of one model run
+
+    Covers the (cleaned) data for the place from start to end, the
+    population, the model configuration and fit checks, and the source
+    code of the model class, all modules in mechbayes.models, the
+    compartment models, and run_place.
+    '''
+    h = hashlib.sha256()
+
+    place_data = data[place]['data'][start:end]
+    h.update(pd.util.hash_pandas_object(place_data).values.tobytes())
+    h.update(json.dumps(list(place_data.columns)).encode())
+    h.update(json.dumps([str(data[place]['pop']), start, end]).encode())
+    h.update(json.dumps(model_config, sort_keys=True).encode())
+    h.update(json.dumps(fit_checks, sort_keys=True).encode())
+
+    package_dir = Path(mechbayes.__file__).parent
+    sources = sorted(package_dir.glob('models/*.py')) + [package_dir / 'compartment.py']
+    model_type = get_method(model_config['model'])
+    for cls in inspect.getmro(model_type):
+        if cls.__module__.startswith('mechbayes'):
+            filename = Path(inspect.getsourcefile(cls))
+            if filename not in sources:
+                sources.append(filename)
+
+    for filename in sources:
+        h.update(filename.read_bytes())
+    h.update(inspect.getsource(util.run_place).encode())
+
+    return h.hexdigest()
+
+def hash_file(prefix, place):
+    '''Input hash is stored next to the samples in samples/<place>.hash'''
+    return Path(prefix) / 'samples' / f'{place}.hash'
+
+def read_input_hash(prefix, place):
+    filename = hash_file(prefix, place)
+    return filename.read_text().strip() if filename.exists() else None
+
+def write_input_hash(prefix, place, value):
+    filename = hash_file(prefix, place)
+    filename.parent.mkdir(mode=0o775, parents=True, exist_ok=True)
+    filename.write_text(value + '\n')
+
+def clear_input_hash(prefix, place):
+    hash_file(prefix, place).unlink(missing_ok=True)
+
+
+def data_file(output_dir, forecast_group, name):
+    '''Path (without extension) of a prepared data snapshot'''
+    return f'{output_dir}/{forecast_group}/data/{name}'
+
+def load_places(data, places):
+    '''Make sure the sources of all places are loaded'''
+    for place in places:
+        data.get(place)
+
+def prepare_cleaned_data(raw_data, places, forecast_date, filename):
+    '''Clean data for forecast date once and save it for all place jobs
+
+    Returns the cleaned panel, memory-mapped from the saved file.
+    '''
+    data = raw_data.copy()
+    load_places(data, places)
+    data_cleaning.clean(data, forecast_date, places)
+    data.to_panel().save(filename)
+    return util.Panel.load(filename)
+
+def truth_file(output_dir, forecast_group):
+    '''Path (without extension) of the truth data for the current data version'''
+    version = jhu.snapshot_name() if jhu.snapshot_dir else pd.Timestamp.now().strftime('%Y-%m-%d')
+    return data_file(output_dir, forecast_group, f'truth_{version}')
+
+def load_truth(output_dir, forecast_group, places):
+    '''Get raw (uncleaned) truth data for scoring and submissions
+
+    The data is saved once per data version (the JHU snapshot if in use,
+    otherwise the current date) and memory-mapped from then on.
+    '''
+    filename = truth_file(output_dir, forecast_group)
+    if Path(f'{filename}.npy').exists():
+        truth = util.Panel.load(filename)
+        if all(place in truth for place in places):
+            return truth
+
+    data = util.load_data(places)
+    load_places(data, places)
+    data.to_panel().save(filename)
+    return util.Panel.load(filename)
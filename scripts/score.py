@@ -7,11 +7,10 @@ import warnings
 import traceback
 
 
-import mechbayes.util as util
-
 from vis_util import install_vis
 from submit_util import create_submission_file
-from run_util import load_config, get_method, do_publish
+from run_util import load_config, do_publish, configure_data, load_truth, truth_file
+from score_util import score_forecast_dates, scores_database, write_scores_db, has_scores_db, aggregate_scores_db
 
 
 if __name__ == "__main__":
@@ -34,12 +33,17 @@ if __name__ == "__main__":
     other_args.add_argument('--scores', help="compute raw scores", dest='do_scores', action='store_true', default=True)
     other_args.add_argument('--no-scores', help="update summaries without computing raw scores", dest='do_scores', action='store_false')
     other_args.set_defaults(do_scores=True)
+    other_args.add_argument('--data_snapshot', help="name of JHU data snapshot to use (default: today)")
+    other_args.add_argument('--offline', help="only read data from local snapshots", action='store_true')
+    other_args.add_argument('--rescore', help="compute raw scores even if samples, truth data and arguments are unchanged since the last run", action='store_true')
+    other_args.add_argument('--jobs', help="number of forecasts (model config and forecast date) to score concurrently (default: 1)", type=int, default=1)
 
 
 
     args = parser.parse_args()
 
     config = load_config(args.config_file)
+    configure_data(config, args.data_snapshot, args.offline)
 
     # output_dir
     output_dir = args.output_dir if args.output_dir else config['output_dir']
@@ -69,68 +73,52 @@ if __name__ == "__main__":
         raise ValueError("must specify either --forecast_dates or --num_sundays")
 
 
-    data = util.load_data()
+    data = load_truth(output_dir, forecast_group, places)
 
     # Only eval forecast dates that have weekahead data
     forecast_dates = [d for d in forecast_dates 
                       if pd.to_datetime("today") >= pd.to_datetime(d) + pd.Timedelta("6d")]
 
+    database = scores_database(output_dir, forecast_group)
+
     # First loop: write details and summary files for each model_config and forecast date
     if args.do_scores:
-        for model_config_name in model_config_names:
-            for forecast_date in forecast_dates:
-                print(f"Scoring {model_config_name} for {forecast_date}")
-                prefix = f'{output_dir}/{forecast_group}/{model_config_name}/{forecast_date}'
-
-                # Get model instance: used to extract forecast from samples
-                model_config = config['model_configs'][model_config_name]
-                model_type = get_method(model_config['model'])
-                score_args = forecast_config['score_args']
-
-                pad_strategy = score_args.get('pad_strategy') or 'shift'
-                num_weeks = score_args.get('num_weeks') or 4
 
-                scores = pd.DataFrame()
+        # WIS is computed for the quantiles of submission files
+        submission_quantiles = forecast_config['score_args'].get('quantiles') or \
+            forecast_config.get('submission_args', {}).get('quantiles')
 
-                for target in score_args['targets']:
+        units = [{'prefix': f'{output_dir}/{forecast_group}/{model_config_name}/{forecast_date}',
+                  'forecast_date': forecast_date,
+                  'model': config['model_configs'][model_config_name]['model'],
+                  'places': places,
+                  'score_args': forecast_config['score_args'],
+                  'quantiles': submission_quantiles,
+                  'truth_version': Path(truth_file(output_dir, forecast_group)).name,
+                  'rescore': args.rescore,
+                  'model_config': model_config_name}
+                 for model_config_name in model_config_names
+                 for forecast_date in forecast_dates]
 
-                    # score all available weeks
-                    target_scores = util.score_forecast(forecast_date,
-                                                         data,
-                                                         places=places,
-                                                         model_type=model_type,
-                                                         prefix=prefix,
-                                                         target=target,
-                                                         freq="week",
-                                                         periods=num_weeks,
-                                                         pad_strategy=pad_strategy)
+        score_forecast_dates(units, data, truth_file(output_dir, forecast_group), jobs=args.jobs, database=database)
 
-                    scores = pd.concat([scores, target_scores])
 
-                summary = util.aggregate_scores(scores)
-
-                summary.to_csv(f"{prefix}/eval.csv", float_format="%.4f", index=False)
-                scores.to_csv(f"{prefix}/scores.csv", float_format="%.4f", index=False)
-
-
-    # Second loop: aggregate over forecast dates and models
+    # Second loop: aggregate over forecast dates and models from the score database
     print(f"Aggregating scores")
     start = forecast_dates[0]
     end = forecast_dates[-1]
     overall_summary = pd.DataFrame()
     for model_config_name in model_config_names:
-        
-        model_config_scores = pd.DataFrame()
 
+        # Add scores written before the database existed
         for forecast_date in forecast_dates:
+            if not has_scores_db(database, model_config_name, forecast_date):
+                prefix = f'{output_dir}/{forecast_group}/{model_config_name}/{forecast_date}'
+                print(f"Reading scores for {prefix}")
+                scores = pd.read_csv(f"{prefix}/scores.csv")
+                write_scores_db(database, model_config_name, forecast_date, scores)
 
-            prefix = f'{output_dir}/{forecast_group}/{model_config_name}/{forecast_date}'
-            print(f"Reading scores for {prefix}")
-            
-            scores = pd.read_csv(f"{prefix}/scores.csv")
-            model_config_scores = pd.concat([model_config_scores, scores])
-        
-        model_config_summary = util.aggregate_scores(model_config_scores)
+        model_config_summary = aggregate_scores_db(database, model_config_name, forecast_dates)
         model_config_summary.insert(0, 'model', model_config_name)
         model_config_summary.to_csv(f"{output_dir}/{forecast_group}/{model_config_name}/eval_{start}_{end}.csv", 
                                     float_format="%.4f",
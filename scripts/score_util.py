@@ -0,0 +1,315 @@
+import json
+import sqlite3
+import hashlib
+import scipy.stats
+import multiprocessing
+import pandas as pd
+from pathlib import Path
+
+import mechbayes.util as util
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from run_util import get_method
+
+'''Utilities for scoring forecasts'''
+
+# Truth data of a worker process (see init_worker)
+truth = None
+
+
+def init_worker(truth_file):
+    '''Memory-map the truth data once in each worker process
+
+    The file is mapped read-only (copy-on-write), so all workers share the
+    same pages of the page cache.
+    '''
+    global truth
+    truth = util.Panel.load(truth_file)
+
+
+'''Score cache
+
+Full-precision scores of each forecast are kept in <prefix>/scores_cache.csv,
+and <prefix>/scores_cache.json records, for each target, a key computed from
+the time the samples of each place were saved, the truth data version, and
+the scoring arguments. Only targets whose key changed are rescored.
+'''
+
+# Increase when scoring changes, to invalidate cached scores
+SCORES_VERSION = 2
+
+CACHE_COLUMNS = ['forecast_date', 'target_end_date']
+
+
+def score_key(prefix, target, model, places, truth_version, args):
+    '''Key of the cached scores of one target'''
+    samples_dir = Path(prefix) / 'samples'
+    key = {'version': SCORES_VERSION,
+           'target': target,
+           'model': model,
+           'truth': truth_version,
+           'args': args,
+           'samples': [(place, util.samples_mtime(samples_dir, place)) for place in places]}
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+def read_score_cache(prefix):
+    '''Cached scores and keys of a forecast (empty if there are none)'''
+    try:
+        with open(f"{prefix}/scores_cache.json") as f:
+            keys = json.load(f)
+        scores = pd.read_csv(f"{prefix}/scores_cache.csv", parse_dates=CACHE_COLUMNS, float_precision="round_trip")
+    except (FileNotFoundError, ValueError, pd.errors.EmptyDataError):
+        return pd.DataFrame(), {}
+    return scores, keys
+
+
+def write_score_cache(prefix, scores, keys):
+    # Keys are written last: if scores are not written completely, they are recomputed
+    scores.to_csv(f"{prefix}/scores_cache.csv", index=False)
+    with open(f"{prefix}/scores_cache.json", "w") as f:
+        json.dump(keys, f, indent=1)
+
+
+'''Score database
+
+Scores of all model configs and forecast dates of a forecast group are also
+kept in one sqlite database, <output_dir>/<forecast_group>/scores.sqlite,
+with one row per model config, forecast date, target, horizon and place.
+Scores over any set of forecast dates are aggregated by queries on it
+instead of reading the scores.csv file of each forecast.
+'''
+
+SCORES_SCHEMA = '''
+create table if not exists scores (
+    model            text,     -- model config name
+    forecast_date    text,
+    target           text,
+    target_end_date  text,
+    time_unit        text,
+    horizon          real,
+    place            text,
+    err              real,
+    log_score        real,
+    quantile         real,
+    crps             real,
+    wis              real,
+    primary key (model, forecast_date, target, time_unit, horizon, place)
+);
+create index if not exists scores_target on scores (target, horizon, place);
+'''
+
+SCORES_COLUMNS = ['target', 'forecast_date', 'target_end_date', 'time_unit', 'horizon', 'place',
+                  'err', 'log_score', 'quantile', 'crps', 'wis']
+
+
+def scores_database(output_dir, forecast_group):
+    '''Path of the score database of a forecast group'''
+    return f'{output_dir}/{forecast_group}/scores.sqlite'
+
+
+def connect_scores(filename):
+    Path(filename).parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(filename, timeout=60)
+    con.executescript(SCORES_SCHEMA)
+    return con
+
+
+def date_key(date):
+    '''Forecast date as stored in the database (YYYY-MM-DD)'''
+    return pd.to_datetime(date).strftime('%Y-%m-%d')
+
+
+def write_scores_db(filename, model_config, forecast_date, scores):
+    '''Replace the scores of one model config and forecast date in the database'''
+
+    scores = scores.reindex(columns=SCORES_COLUMNS)
+    for col in ['forecast_date', 'target_end_date']:
+        scores[col] = pd.to_datetime(scores[col]).dt.strftime('%Y-%m-%d')
+    scores = scores.astype(object).where(scores.notna(), None)
+    forecast_date = date_key(forecast_date)
+
+    con = connect_scores(filename)
+    with con:
+        con.execute('delete from scores where model = ? and forecast_date = ?', (model_config, forecast_date))
+        con.executemany(f'insert into scores (model, {", ".join(SCORES_COLUMNS)}) '
+                        f'values ({", ".join(["?"] * (len(SCORES_COLUMNS) + 1))})',
+                        [(model_config, *row) for row in scores.itertuples(index=False)])
+    con.close()
+
+
+def has_scores_db(filename, model_config, forecast_date):
+    '''Check if the database has scores for a model config and forecast date'''
+    if not Path(filename).exists():
+        return False
+    con = connect_scores(filename)
+    row = con.execute('select 1 from scores where model = ? and forecast_date = ? limit 1',
+                      (model_config, date_key(forecast_date))).fetchone()
+    con.close()
+    return row is not None
+
+
+def score_filter(model_config=None, forecast_dates=None, start=None, end=None):
+    '''Where clause and parameters to select scores by model config and forecast dates'''
+    conditions, params = [], []
+    if model_config is not None:
+        conditions.append('model = ?')
+        params.append(model_config)
+    if forecast_dates is not None:
+        conditions.append(f'forecast_date in ({", ".join(["?"] * len(forecast_dates))})')
+        params.extend(date_key(d) for d in forecast_dates)
+    if start is not None:
+        conditions.append('forecast_date >= ?')
+        params.append(date_key(start))
+    if end is not None:
+        conditions.append('forecast_date <= ?')
+        params.append(date_key(end))
+    where = f'where {" and ".join(conditions)}' if conditions else ''
+    return where, params
+
+
+def load_scores_db(filename, model_config=None, forecast_dates=None, start=None, end=None):
+    '''Get scores from the database as a data frame (all scores by default)'''
+    where, params = score_filter(model_config, forecast_dates, start, end)
+    con = connect_scores(filename)
+    scores = pd.read_sql_query(f'select * from scores {where}', con, params=params)
+    con.close()
+    return scores
+
+
+def aggregate_scores_db(filename, model_config=None, forecast_dates=None, start=None, end=None):
+    '''Aggregate scores in the database by target and horizon (see util.aggregate_scores)
+
+    Scores are selected by model config and by a list of forecast dates or a
+    range from start to end (inclusive). Means are computed by a grouped query;
+    the median absolute error and KS statistic need all values of a group and
+    are computed from a second query.
+    '''
+    where, params = score_filter(model_config, forecast_dates, start, end)
+    keys = ['target', 'time_unit', 'horizon']
+    columns = keys + ['count', 'signed_err', 'MAE', 'medAE', 'log_score', 'KS', 'KS_pval', 'CRPS', 'WIS']
+
+    con = connect_scores(filename)
+    means = pd.read_sql_query(f'''
+        select target, time_unit, horizon,
+               count(*) as count,
+               avg(err) as signed_err,
+               avg(abs(err)) as MAE,
+               avg(log_score) as log_score,
+               avg(crps) as CRPS,
+               avg(wis) as WIS
+        from scores {where}
+        group by target, time_unit, horizon
+        order by target, time_unit, horizon''', con, params=params)
+    values = pd.read_sql_query(f'select target, time_unit, horizon, abs(err) as abs_err, quantile from scores {where}',
+                               con, params=params)
+    con.close()
+
+    if len(values) == 0:
+        return pd.DataFrame(columns=columns)
+
+    groups = values.groupby(keys)
+    ks = groups['quantile'].apply(lambda q: pd.Series(scipy.stats.kstest(q, 'uniform'), index=['KS', 'KS_pval'])).unstack()
+    stats = pd.concat([groups['abs_err'].median().rename('medAE'), ks], axis=1).reset_index()
+
+    summary = means.merge(stats, on=keys, how='left')
+    summary[['CRPS', 'WIS']] = summary[['CRPS', 'WIS']].astype(float)
+    return summary[columns]
+
+
+def score_forecast_date(prefix, forecast_date, model, places, score_args, quantiles=None, truth_version=None, rescore=False, data=None):
+    '''Score one model config and forecast date; writes scores.csv and eval.csv in prefix
+
+    model is the name of the model class (e.g., mechbayes.models.SEIRD_renewal.SEIRD),
+    used to extract forecasts from samples. WIS is computed from the sample quantiles
+    at the given levels (default: util.HUB_QUANTILES). Targets whose samples, truth
+    data version (truth_version) and arguments are unchanged since they were last
+    scored are read from the cache, unless rescore is True. If data is None, the
+    truth data of the worker process is used. Returns the scores.
+    '''
+    targets = score_args['targets']
+    pad_strategy = score_args.get('pad_strategy') or 'shift'
+    num_weeks = score_args.get('num_weeks') or 4
+    quantiles = quantiles or util.HUB_QUANTILES
+
+    args = {'freq': 'week', 'periods': num_weeks, 'pad_strategy': pad_strategy, 'quantiles': quantiles}
+    keys = {target: score_key(prefix, target, model, places, truth_version, args) for target in targets}
+
+    cached, cached_keys = (pd.DataFrame(), {}) if rescore or truth_version is None else read_score_cache(prefix)
+    stale = [target for target in targets if cached_keys.get(target) != keys[target]]
+
+    if not stale:
+        print(f"Scores for {prefix} are up to date")
+    else:
+        print(f"Scoring {', '.join(stale)} for {prefix}")
+
+    scores = pd.DataFrame()
+    if stale:
+        data = truth if data is None else data
+        model_type = get_method(model)
+
+        # score all available weeks; each place's samples are loaded once for all targets
+        scores = util.score_forecast_targets(forecast_date,
+                                             data,
+                                             places=places,
+                                             model_type=model_type,
+                                             prefix=prefix,
+                                             targets=stale,
+                                             freq=args['freq'],
+                                             periods=num_weeks,
+                                             pad_strategy=pad_strategy,
+                                             quantiles=quantiles)
+
+    # Targets that could not be scored for any place have no rows (or columns)
+    def target_rows(df, target):
+        return df[df['target'] == target] if len(df) else df
+
+    # Only keep the keys of targets scored for all places, so failures are retried
+    failed = [target for target in stale if set(target_rows(scores, target).get('place', [])) != set(places)]
+    keys = {target: key for target, key in keys.items() if target not in failed}
+
+    # Combine fresh and cached scores in target order
+    frames = [target_rows(scores, target) if target in stale else target_rows(cached, target)
+              for target in targets]
+    scores = pd.concat([df for df in frames if len(df)], ignore_index=True) if any(len(df) for df in frames) else pd.DataFrame()
+
+    if stale and truth_version is not None:
+        write_score_cache(prefix, scores, keys)
+
+    summary = util.aggregate_scores(scores)
+
+    summary.to_csv(f"{prefix}/eval.csv", float_format="%.4f", index=False)
+    scores.to_csv(f"{prefix}/scores.csv", float_format="%.4f", index=False)
+
+    return scores
+
+
+def score_forecast_dates(units, data, truth_file, jobs=1, database=None):
+    '''Score units (dicts of arguments for score_forecast_date)
+
+    With jobs > 1, units are scored in a pool of worker processes that
+    memory-map the truth data from truth_file. If database is given, the
+    scores of each unit are written to it under the name in the unit's
+    'model_config' entry. Only this process writes the database, since it
+    is often on shared storage where concurrent sqlite writers fail.
+    '''
+    def score_args(unit):
+        return {k: v for k, v in unit.items() if k != 'model_config'}
+
+    def save(unit, scores):
+        if database is not None:
+            write_scores_db(database, unit['model_config'], unit['forecast_date'], scores)
+
+    if jobs <= 1:
+        for unit in units:
+            save(unit, score_forecast_date(**score_args(unit), data=data))
+        return
+
+    # Start fresh worker processes: forking after jax is initialized is unsafe
+    context = multiprocessing.get_context('spawn')
+
+    print(f"Scoring {len(units)} forecasts with {jobs} jobs")
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context, initializer=init_worker, initargs=(truth_file,)) as executor:
+        futures = {executor.submit(score_forecast_date, **score_args(unit)): unit for unit in units}
+        for future in as_completed(futures):
+            save(futures[future], future.result())
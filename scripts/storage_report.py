@@ -0,0 +1,111 @@
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as onp
+import pandas as pd
+
+import mechbayes.util as util
+
+
+def read_all(groups):
+    '''Read every field into memory; returns total bytes read'''
+    return sum(onp.array(group[field]).nbytes
+               for group in groups if group is not None
+               for field in group)
+
+
+def timed_load(load, repeats):
+    '''Best time (seconds) to load and read all fields'''
+    times = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        read_all(load())
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def max_error(groups, decoded):
+    '''Largest relative error of decoded fields'''
+    err = 0.0
+    for group, other in zip(groups, decoded):
+        for field in group or {}:
+            x, y = onp.asarray(group[field], dtype=float), onp.asarray(other[field], dtype=float)
+            ok = onp.isfinite(x) & (x != 0)
+            if ok.any():
+                err = max(err, float(onp.max(onp.abs(y[ok] - x[ok]) / onp.abs(x[ok]))))
+    return err
+
+
+def dir_size(path):
+    return sum(f.stat().st_size for f in Path(path).iterdir())
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description='Report size and load time of saved samples for each storage option'
+    )
+    parser.add_argument('samples_dir', help='samples directory of a forecast (e.g., US/renewal/2021-08-01/samples)')
+    parser.add_argument('--places', nargs="+", help='places to include (default: all saved places)')
+    parser.add_argument('--storage', nargs="+", help='storage options to compare (default: all)', default=util.SAMPLE_STORAGE)
+    parser.add_argument('--repeats', help='load each place this many times and report the fastest (default: 3)', type=int, default=3)
+    parser.add_argument('--output', help='also write the per-place report to this csv file')
+
+    args = parser.parse_args()
+
+    places = args.places or util.saved_places(args.samples_dir)
+    tmp = Path(tempfile.mkdtemp())
+
+    rows = []
+    try:
+        for place in places:
+            groups = util.load_place_samples(args.samples_dir, place, mmap_mode=None)
+            path = util.samples_path(args.samples_dir, place)
+            if util.archived(args.samples_dir, place):
+                current = 'archive'
+                entry = util.sample_archive(args.samples_dir).index()[place]
+                size = sum(int(onp.prod(f['shape'])) * onp.dtype(f['dtype']).itemsize
+                           for fields in entry['groups'].values() if fields is not None
+                           for f in fields.values())
+            elif path.suffix == '.npz':
+                current = 'npz'
+                size = path.stat().st_size
+            else:
+                current = 'store'
+                size = dir_size(path)
+            rows.append({'place': place,
+                         'storage': 'current',
+                         'format': current,
+                         'bytes': size,
+                         'load_time': timed_load(lambda: util.load_place_samples(args.samples_dir, place), args.repeats),
+                         'max_rel_error': 0.0})
+
+            for storage in args.storage:
+                filename = tmp / place
+                util.save_samples(filename, *groups, storage=storage)
+                rows.append({'place': place,
+                             'storage': storage,
+                             'format': 'store',
+                             'bytes': dir_size(filename),
+                             'load_time': timed_load(lambda: util.load_samples(filename), args.repeats),
+                             'max_rel_error': max_error(groups, util.load_samples(filename))})
+                shutil.rmtree(filename)
+    finally:
+        shutil.rmtree(tmp)
+
+    report = pd.DataFrame(rows)
+    if args.output:
+        report.to_csv(args.output, index=False)
+
+    summary = report.groupby('storage', sort=False).agg(places=('place', 'count'),
+                                                        megabytes=('bytes', 'sum'),
+                                                        load_seconds=('load_time', 'sum'),
+                                                        max_rel_error=('max_rel_error', 'max'))
+    summary['megabytes'] /= 1e6
+    baseline = summary.iloc[0]
+    summary['size_ratio'] = summary['megabytes'] / baseline['megabytes']
+    summary['load_ratio'] = summary['load_seconds'] / baseline['load_seconds']
+    print(summary.to_string(float_format=lambda x: f'{x:.4g}'))
@@ -1,4 +1,3 @@
-import numpy as np
 import pandas as pd
 import mechbayes.util as util
 import mechbayes.jhu as jhu
@@ -10,7 +9,6 @@ import warnings
 def create_submission_file(prefix, forecast_date, model, data, places, submit_args):
     
     print(f"Creating submission file in {prefix}")
-    samples_directory = f"{prefix}/samples"
     
     model_name = submit_args["model_name"]
     team_name = submit_args["team_name"]
@@ -35,7 +33,7 @@ def create_submission_file(prefix, forecast_date, model, data, places, submit_ar
                                                             places,
                                                             quantiles,
                                                             num_weeks,
-                                                            samples_directory,
+                                                            prefix,
                                                             pad_strategy)
 
         has_any_missing = has_any_missing or has_missing_place
@@ -104,7 +102,7 @@ def generate_forecast_df(forecast_date,
                          places,
                          quantiles,
                          num_weeks,
-                         samples_directory,
+                         prefix,
                          pad_strategy="shift"):
 
     forecast_start = forecast_date #+ pd.Timedelta("1d")
@@ -126,30 +124,38 @@ def generate_forecast_df(forecast_date,
     has_missing_place = False
 
     for place in places:
-        try:
-            prior_samples, mcmc_samples, post_pred_samples, forecast_samples = \
-                util.load_samples(f"{samples_directory}/{place}.npz")
-        except Exception as e:
-            warnings.warn(f"Failed to load data: {samples_directory}/{place}.npz")
-            has_missing_place = True
-            continue
 
         jhu_variable = target2jhu[target]
         truth_data = data[place]['data'][jhu_variable]        
 
-        forecast_samples = model.get(forecast_samples, variable_name, forecast=True)
-        daily_df = util.construct_daily_df(forecast_start, forecast_samples, target, truth_data=truth_data, pad_strategy=pad_strategy)
-        weekly_df = util.resample_to_weekly(daily_df, target)
+        # Use quantiles precomputed at fit time if available
+        summary = util.load_forecast_summary(prefix, place)
+        weekly = summary and util.summary_weekly_quantiles(summary, forecast_date, target, quantiles,
+                                                           truth_data=truth_data, pad_strategy=pad_strategy)
+
+        if weekly is None:
+            samples_directory = f"{prefix}/samples"
+            try:
+                prior_samples, mcmc_samples, post_pred_samples, forecast_samples = \
+                    util.load_place_samples(samples_directory, place)
+            except Exception as e:
+                warnings.warn(f"Failed to load samples for {place} from {samples_directory}")
+                has_missing_place = True
+                continue
+
+            forecast_samples = model.get(forecast_samples, variable_name, forecast=True)
+            daily_df = util.construct_daily_df(forecast_start, forecast_samples, target, truth_data=truth_data, pad_strategy=pad_strategy)
+            weekly_df = util.resample_to_weekly(daily_df, target)
+            weekly = util.weekly_sample_quantiles(weekly_df, quantiles)
 
         for week_ahead in range(1, num_weeks+1):
             target_week_start = forecast_date + pd.Timedelta(weeks=week_ahead-1)
-            samples = weekly_df.loc[target_week_start]
+            predictions = weekly.loc[target_week_start].values
             target_end_date_datetime = pd.to_datetime(target_week_start) + next_saturday
             target_end_date = target_end_date_datetime.strftime("%Y-%m-%d")
             week_ahead_target = f"{week_ahead:d} wk ahead {target}"
             
-            for q in quantiles:
-                prediction = np.percentile(samples, q*100)
+            for q, prediction in zip(quantiles, predictions):
                 forecast["quantile"].append("{:.3f}".format(q))
                 forecast["value"].append(prediction)
                 forecast["type"].append("quantile")
@@ -0,0 +1,41 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from local_util import run_task, thread_env, default_threads, core_slots
+from queue_util import work, queue_status, LEASE_TIME
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Run tasks from a work queue written by launch.py until it is empty.')
+
+    parser.add_argument('--queue_dir', help='queue directory', required=True)
+    parser.add_argument('--jobs', help="number of tasks to run concurrently (default: 1)", type=int, default=1)
+    parser.add_argument('--threads', help="compute threads per task (default: cores / jobs)", type=int)
+    parser.add_argument('--lease_time', help=f"seconds before the task of an unresponsive worker is retried (default: {LEASE_TIME})", type=float, default=LEASE_TIME)
+    parser.add_argument('--max_attempts', help="maximum attempts for a task whose lease expires (default: 3)", type=int, default=3)
+    parser.add_argument('--poll', help="seconds to wait for tasks held by other workers (default: 30)", type=float, default=30)
+
+    args = parser.parse_args()
+
+    threads = args.threads or default_threads(args.jobs)
+    env = thread_env(threads)
+    slots = core_slots(args.jobs, threads)
+
+    def run(task):
+        print(f"Running {task['name']}")
+        result = run_task(task, env, slots=slots)
+        print(f"Finished {task['name']} with exit status {result['status']}")
+        return result
+
+    with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        futures = [executor.submit(work,
+                                   args.queue_dir,
+                                   run,
+                                   lease_time=args.lease_time,
+                                   max_attempts=args.max_attempts,
+                                   poll=args.poll)
+                   for i in range(args.jobs)]
+        results = [r for future in futures for r in future.result()]
+
+    num_failed = sum(r['status'] != 0 for r in results)
+    print(f"Worker ran {len(results)} tasks ({num_failed} failed). Queue status: {queue_status(args.queue_dir)}")